@@ -916,6 +916,7 @@ def daily_monthly_data():
     if not progress_data.empty:
         # Format the dataframe for display
         display_df = progress_data.copy()
+        display_df['entry_date'] = display_df['entry_date'].dt.strftime('%Y-%m-%d')
         display_df.columns = ['تاريخ الإدخال', 'نسبة الإنجاز المخطط (%)', 'التكلفة المخططة', 
                              'نسبة الإنجاز الفعلي (%)', 'التكلفة الفعلية', 'ملاحظات']
         display_df['التكلفة المخططة'] = display_df['التكلفة المخططة'].apply(format_currency)
@@ -1104,7 +1105,9 @@ def portfolio_kpi_report():
         # Export functionality
         if st.button("تصدير تقرير KPI"):
             exporter = ExcelExporter(st.session_state.data_manager)
-            excel_buffer = exporter.export_portfolio_kpi_to_excel(portfolio_kpi)
+            excel_buffer = exporter.export_portfolio_kpi_to_excel(
+                calculator.calculate_portfolio_kpi(include_details=True)
+            )
             if excel_buffer:
                 st.download_button(
                     label="تحميل تقرير KPI كملف Excel",
@@ -1123,7 +1126,12 @@ def detailed_project_report():
         return
     
     calculator = EVMCalculator(st.session_state.data_manager)
-    project_kpi = calculator.calculate_project_kpi(st.session_state.selected_project)
+    try:
+        project_kpi = calculator.calculate_project_kpi(st.session_state.selected_project)
+    except Exception as e:
+        print(f"Error calculating project KPI: {e}")
+        st.error("خطأ في حساب مؤشرات أداء المشروع")
+        return
     
     if project_kpi:
         # Project basic info
@@ -4,14 +4,30 @@ import sqlite3
 from datetime import datetime
 import zipfile
 import shutil
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class ProgressRow(NamedTuple):
+    """Latest progress values of a project, as needed for KPI calculation"""
+    planned_completion: float
+    actual_completion: float
+    actual_cost: float
 
 class DataManager:
+    # Maximum number of per-project progress frames kept in memory
+    PROGRESS_CACHE_SIZE = 64
+
     def __init__(self):
         self.data_dir = "data"
         self.db_path = os.path.join(self.data_dir, "projects.db")
         self.backup_dir = "backups"
+        self._progress_cache = OrderedDict()
+        self._projects_cache = None
+        self._projects_map_cache = None
+        self._cache_signature = None
+        self._cache_version = None
         self.ensure_directories()
         self.init_database()
         self.migrate_database()
@@ -158,45 +174,77 @@ class DataManager:
         except Exception as e:
             print(f"Database migration error: {e}")
     
+    # Column order shared by add_project and add_projects_bulk
+    _PROJECT_INSERT_SQL = '''
+        INSERT OR REPLACE INTO projects 
+        (project_name, project_id, parent_category_id, executing_company, consulting_company, start_date, 
+         end_date, total_budget, project_location, project_type, 
+         project_description, display_order, contractor_name, project_manager, created_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def _project_row(self, project_data: Dict) -> tuple:
+        """Build the INSERT parameters for one project"""
+        return (
+            project_data['project_name'],
+            project_data.get('project_id', ''),
+            project_data.get('parent_category_id', None),
+            project_data['executing_company'],
+            project_data['consulting_company'],
+            project_data['start_date'],
+            project_data['end_date'],
+            project_data['total_budget'],
+            project_data['project_location'],
+            project_data['project_type'],
+            project_data['project_description'],
+            project_data.get('display_order', 0),
+            project_data.get('contractor_name', ''),
+            project_data.get('project_manager', ''),
+            project_data['created_date']
+        )
+    
     def add_project(self, project_data: Dict) -> bool:
         """Add a new project to the database"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO projects 
-                (project_name, project_id, parent_category_id, executing_company, consulting_company, start_date, 
-                 end_date, total_budget, project_location, project_type, 
-                 project_description, display_order, contractor_name, project_manager, created_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                project_data['project_name'],
-                project_data.get('project_id', ''),
-                project_data.get('parent_category_id', None),
-                project_data['executing_company'],
-                project_data['consulting_company'],
-                project_data['start_date'],
-                project_data['end_date'],
-                project_data['total_budget'],
-                project_data['project_location'],
-                project_data['project_type'],
-                project_data['project_description'],
-                project_data.get('display_order', 0),
-                project_data.get('contractor_name', ''),
-                project_data.get('project_manager', ''),
-                project_data['created_date']
-            ))
+            cursor.execute(self._PROJECT_INSERT_SQL, self._project_row(project_data))
             
             conn.commit()
             conn.close()
+            self._invalidate_projects_cache()
             return True
         except Exception as e:
             print(f"Error adding project: {e}")
             return False
     
+    def add_projects_bulk(self, projects: List[Dict]) -> bool:
+        """Add several projects in a single transaction (all or none are stored)"""
+        if not projects:
+            return True
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            # executemany runs inside one implicit transaction, committed once
+            cursor.executemany(self._PROJECT_INSERT_SQL, [self._project_row(project) for project in projects])
+            
+            conn.commit()
+            conn.close()
+            self._invalidate_projects_cache()
+            return True
+        except Exception as e:
+            print(f"Error adding projects: {e}")
+            return False
+    
     def get_all_projects(self) -> List[Dict]:
         """Retrieve all projects from the database with parent category info"""
+        self._drop_stale_caches()
+        if self._projects_cache is not None:
+            return [dict(project) for project in self._projects_cache]
+        
         try:
             conn = sqlite3.connect(self.db_path)
             query = '''
@@ -207,7 +255,8 @@ class DataManager:
             '''
             df = pd.read_sql_query(query, conn)
             conn.close()
-            return df.to_dict('records')
+            self._projects_cache = df.to_dict('records')
+            return [dict(project) for project in self._projects_cache]
         except Exception as e:
             print(f"Error retrieving projects: {e}")
             return []
@@ -244,6 +293,7 @@ class DataManager:
             ''', (new_parent_category_id, new_display_order, project_name))
             conn.commit()
             conn.close()
+            self._invalidate_projects_cache()
             return True
         except Exception as e:
             print(f"Error updating project parent category: {e}")
@@ -266,72 +316,288 @@ class DataManager:
             print(f"Error grouping projects by category: {e}")
             return {}
     
-    def get_project_info(self, project_name: str) -> Optional[Dict]:
-        """Get detailed information for a specific project"""
+    def get_projects_map(self) -> Dict[str, Dict]:
+        """Get project info for every project keyed by name (cached until the database changes)
+        
+        Each row is a copy, so callers may modify them without touching the cache.
+        """
+        return {project_name: dict(project_info) for project_name, project_info in self._get_projects_map().items()}
+    
+    def _get_projects_map(self) -> Dict[str, Dict]:
+        """Return the cached projects map itself (callers must not modify it)"""
+        self._drop_stale_caches()
+        if self._projects_map_cache is not None:
+            return self._projects_map_cache
+        
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM projects WHERE project_name = ?", (project_name,))
-            result = cursor.fetchone()
+            # Same ordering as get_all_projects so iteration follows display order
+            cursor.execute('''
+                SELECT p.*
+                FROM projects p
+                LEFT JOIN parent_categories pc ON p.parent_category_id = pc.id
+                ORDER BY pc.category_name, p.display_order, p.created_date DESC
+            ''')
+            columns = [column[0] for column in cursor.description]
+            projects_map = {}
+            for row in cursor.fetchall():
+                project_info = dict(zip(columns, row))
+                projects_map[project_info['project_name']] = project_info
             conn.close()
             
-            if result:
-                columns = ['id', 'project_name', 'executing_company', 'consulting_company',
-                          'start_date', 'end_date', 'total_budget', 'project_location',
-                          'project_type', 'project_description', 'created_date']
-                return dict(zip(columns, result))
-            return None
+            self._projects_map_cache = projects_map
+            return projects_map
         except Exception as e:
-            print(f"Error retrieving project info: {e}")
-            return None
+            print(f"Error retrieving projects map: {e}")
+            return {}
+    
+    def _invalidate_projects_cache(self):
+        """Drop cached project lookups after a write to the projects table"""
+        self._projects_cache = None
+        self._projects_map_cache = None
+    
+    def get_project_info(self, project_name: str) -> Optional[Dict]:
+        """Get detailed information for a specific project"""
+        project_info = self._get_projects_map().get(project_name)
+        return dict(project_info) if project_info else None
     
     def get_project_by_name(self, project_name: str) -> Optional[Dict]:
         """Get project by name - alias for get_project_info"""
         return self.get_project_info(project_name)
     
+    # Column order shared by add_progress_data and add_progress_data_bulk
+    _PROGRESS_INSERT_SQL = '''
+        INSERT INTO progress_data 
+        (project_name, entry_date, planned_completion, planned_cost,
+         actual_completion, actual_cost, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def _progress_row(self, progress_data: Dict) -> tuple:
+        """Build the INSERT parameters for one progress entry"""
+        return (
+            progress_data['project_name'],
+            progress_data['entry_date'],
+            progress_data['planned_completion'],
+            progress_data['planned_cost'],
+            progress_data['actual_completion'],
+            progress_data['actual_cost'],
+            progress_data['notes']
+        )
+    
     def add_progress_data(self, progress_data: Dict) -> bool:
         """Add progress data entry"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO progress_data 
-                (project_name, entry_date, planned_completion, planned_cost,
-                 actual_completion, actual_cost, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                progress_data['project_name'],
-                progress_data['entry_date'],
-                progress_data['planned_completion'],
-                progress_data['planned_cost'],
-                progress_data['actual_completion'],
-                progress_data['actual_cost'],
-                progress_data['notes']
-            ))
+            cursor.execute(self._PROGRESS_INSERT_SQL, self._progress_row(progress_data))
             
             conn.commit()
             conn.close()
+            self._invalidate_progress_cache(progress_data['project_name'])
+            return True
+        except Exception as e:
+            print(f"Error adding progress data: {e}")
+            return False
+    
+    def add_progress_data_bulk(self, progress_entries: List[Dict]) -> bool:
+        """Add several progress entries in a single transaction (all or none are stored)"""
+        if not progress_entries:
+            return True
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            # executemany runs inside one implicit transaction, committed once
+            cursor.executemany(self._PROGRESS_INSERT_SQL, [self._progress_row(entry) for entry in progress_entries])
+            
+            conn.commit()
+            conn.close()
+            for project_name in {entry['project_name'] for entry in progress_entries}:
+                self._invalidate_progress_cache(project_name)
             return True
         except Exception as e:
             print(f"Error adding progress data: {e}")
             return False
     
     def get_progress_data(self, project_name: str) -> pd.DataFrame:
-        """Retrieve progress data for a specific project"""
+        """Retrieve progress data for a specific project, sorted by date with parsed entry_date"""
+        self._drop_stale_caches()
+        cached = self._progress_cache.get(project_name)
+        if cached is not None:
+            self._progress_cache.move_to_end(project_name)
+            return cached.copy()
+        
         try:
             conn = sqlite3.connect(self.db_path)
             df = pd.read_sql_query(
-                "SELECT entry_date, planned_completion, planned_cost, actual_completion, actual_cost, notes FROM progress_data WHERE project_name = ? ORDER BY entry_date",
+                "SELECT entry_date, planned_completion, planned_cost, actual_completion, actual_cost, notes FROM progress_data WHERE project_name = ? ORDER BY entry_date, id",
                 conn,
                 params=[project_name]
             )
             conn.close()
-            return df
+            
+            # Parse dates once here so callers don't have to convert and re-sort; a malformed
+            # date becomes NaT on its own row instead of failing the whole project
+            if not df.empty:
+                df['entry_date'] = pd.to_datetime(df['entry_date'], format='ISO8601', errors='coerce')
+            
+            self._progress_cache[project_name] = df
+            if len(self._progress_cache) > self.PROGRESS_CACHE_SIZE:
+                self._progress_cache.popitem(last=False)
+            return df.copy()
         except Exception as e:
             print(f"Error retrieving progress data: {e}")
             return pd.DataFrame()
     
+    def get_progress_data_bulk(self, project_names: List[str]) -> Dict[str, pd.DataFrame]:
+        """Retrieve progress data for several projects, fetching the uncached ones in one query
+        
+        Each frame matches get_progress_data for that project; projects without progress
+        get an empty frame.
+        """
+        self._drop_stale_caches()
+        progress_map = {}
+        missing = []
+        for project_name in dict.fromkeys(project_names):
+            cached = self._progress_cache.get(project_name)
+            if cached is not None:
+                self._progress_cache.move_to_end(project_name)
+                progress_map[project_name] = cached.copy()
+            else:
+                missing.append(project_name)
+        if not missing:
+            return progress_map
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            placeholders = ','.join('?' * len(missing))
+            df = pd.read_sql_query(
+                f"SELECT project_name, entry_date, planned_completion, planned_cost, actual_completion, actual_cost, notes FROM progress_data WHERE project_name IN ({placeholders}) ORDER BY project_name, entry_date, id",
+                conn,
+                params=missing
+            )
+            conn.close()
+            
+            groups = dict(tuple(df.groupby('project_name', sort=False)))
+            columns = [column for column in df.columns if column != 'project_name']
+            for project_name in missing:
+                group = groups.get(project_name)
+                if group is None:
+                    project_df = pd.DataFrame(columns=columns)
+                else:
+                    project_df = group.drop(columns='project_name').reset_index(drop=True)
+                    # Dates are parsed per project, as get_progress_data does
+                    project_df['entry_date'] = pd.to_datetime(project_df['entry_date'], format='ISO8601', errors='coerce')
+                
+                self._progress_cache[project_name] = project_df
+                if len(self._progress_cache) > self.PROGRESS_CACHE_SIZE:
+                    self._progress_cache.popitem(last=False)
+                progress_map[project_name] = project_df.copy()
+            return progress_map
+        except Exception as e:
+            print(f"Error retrieving progress data for multiple projects: {e}")
+            return progress_map
+    
+    def _database_change_counter(self) -> Optional[bytes]:
+        """Read the change counter SQLite bumps in the file header on every committed write"""
+        try:
+            with open(self.db_path, 'rb') as db_file:
+                return db_file.read(28)[24:28]
+        except OSError:
+            return None
+    
+    def _drop_stale_caches(self):
+        """Clear the progress and project caches if the database changed since they were filled
+        
+        Writes from any connection (other sessions' DataManagers included) count. Each read
+        only stats the file; the header is read only when its mtime or size moved, so a
+        touch without a committed write keeps the caches.
+        """
+        try:
+            stat = os.stat(self.db_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature is not None and signature == self._cache_signature:
+            return
+        
+        self._cache_signature = signature
+        version = self._database_change_counter() if signature is not None else None
+        if version is None or version != self._cache_version:
+            self._progress_cache.clear()
+            self._projects_cache = None
+            self._projects_map_cache = None
+            self._cache_version = version
+    
+    def _invalidate_progress_cache(self, project_name: str = None):
+        """Drop cached progress frames after a write (all projects if no name given)"""
+        if project_name is None:
+            self._progress_cache.clear()
+        else:
+            self._progress_cache.pop(project_name, None)
+
+    def get_latest_progress_row(self, project_name: str) -> Optional[ProgressRow]:
+        """Get only the most recent progress entry for a project"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT planned_completion, actual_completion, actual_cost
+                FROM progress_data
+                WHERE project_name = ?
+                ORDER BY entry_date DESC, id DESC
+                LIMIT 1
+            ''', (project_name,))
+            result = cursor.fetchone()
+            conn.close()
+            
+            return ProgressRow(*result) if result else None
+        except Exception as e:
+            print(f"Error retrieving latest progress: {e}")
+            return None
+
+    def get_latest_progress_all(self) -> Dict[str, ProgressRow]:
+        """Get the most recent progress entry of every project in a single query"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT project_name, planned_completion, actual_completion, actual_cost
+                FROM (
+                    SELECT project_name, planned_completion, actual_completion, actual_cost,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY project_name ORDER BY entry_date DESC, id DESC
+                           ) AS row_num
+                    FROM progress_data
+                )
+                WHERE row_num = 1
+            ''')
+            latest = {row[0]: ProgressRow(*row[1:]) for row in cursor.fetchall()}
+            conn.close()
+            return latest
+        except sqlite3.OperationalError as e:
+            # SQLite builds older than 3.25 have no window functions
+            print(f"Window query unavailable, fetching latest progress per project: {e}")
+            return self._get_latest_progress_parallel()
+        except Exception as e:
+            print(f"Error retrieving latest progress for all projects: {e}")
+            return {}
+    
+    def _get_latest_progress_parallel(self, max_workers: int = 8) -> Dict[str, ProgressRow]:
+        """Fetch each project's latest progress row on a thread pool
+        
+        Every query opens its own connection, so the calls are independent
+        and the threads overlap on database I/O.
+        """
+        project_names = list(self._get_projects_map())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self.get_latest_progress_row, project_names)
+            return {name: latest for name, latest in zip(project_names, results) if latest}
+
     def delete_project_progress(self, project_name: str) -> bool:
         """Delete only progress data for a project (for updates)"""
         try:
@@ -343,6 +609,7 @@ class DataManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_progress_cache(project_name)
             return True
         except Exception as e:
             print(f"Error deleting project progress data: {e}")
@@ -368,6 +635,8 @@ class DataManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_progress_cache(project_name)
+            self._invalidate_projects_cache()
             return True
         except Exception as e:
             print(f"Error deleting project: {e}")
@@ -426,8 +695,12 @@ class DataManager:
             print(f"Error retrieving resources: {e}")
             return pd.DataFrame()
     
-    def get_cash_flow_data(self, project_name: str = None, start_date=None, end_date=None) -> pd.DataFrame:
-        """Get cash flow data for reporting with proper date filtering"""
+    def get_cash_flow_data(self, project_name: str = None, start_date=None, end_date=None,
+                           sort_by_date: bool = False) -> pd.DataFrame:
+        """Get cash flow data for reporting with proper date filtering
+        
+        Rows are ordered by project then date, or by date first when sort_by_date is set.
+        """
         try:
             conn = sqlite3.connect(self.db_path)
             
@@ -453,7 +726,10 @@ class DataManager:
                 query += " AND p.entry_date BETWEEN ? AND ?"
                 params.extend([start_date, end_date])
             
-            query += " ORDER BY pr.project_name, p.entry_date"
+            if sort_by_date:
+                query += " ORDER BY p.entry_date, pr.project_name, p.id"
+            else:
+                query += " ORDER BY pr.project_name, p.entry_date, p.id"
             
             df = pd.read_sql_query(query, conn, params=params)
             conn.close()
@@ -539,6 +815,8 @@ class DataManager:
             
             # Reinitialize database connection
             self.init_database()
+            self._invalidate_progress_cache()
+            self._invalidate_projects_cache()
             
             return True
         except Exception as e:
@@ -558,6 +836,8 @@ class DataManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_progress_cache()
+            self._invalidate_projects_cache()
             return True
         except Exception as e:
             print(f"Error clearing data: {e}")
@@ -634,7 +914,7 @@ class DataManager:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT file_name, file_content, imported_date, projects_imported 
+                SELECT file_name, file_content, imported_date, projects_imported, file_hash 
                 FROM original_excel_files 
                 ORDER BY imported_date DESC 
                 LIMIT 1
@@ -647,7 +927,8 @@ class DataManager:
                     'file_name': result[0],
                     'file_content': result[1],
                     'imported_date': result[2],
-                    'projects_imported': result[3].split(',') if result[3] else []
+                    'projects_imported': result[3].split(',') if result[3] else [],
+                    'file_hash': result[4]
                 }
             return {}
         except Exception as e:
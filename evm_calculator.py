@@ -1,100 +1,137 @@
+import numpy as np
 import pandas as pd
+from bisect import bisect_right
 from datetime import datetime, date
 from typing import Dict, List, Optional
-from data_manager import DataManager
+from data_manager import DataManager, ProgressRow
+
+# Project status labels, ordered from best to worst
+STATUS_CATEGORIES = ['متقدم', 'على المسار', 'متأخر']
+
+# SPI/CPI bucket edges: below 0.9, 0.9 up to 1.0, and 1.0 or above
+_STATUS_THRESHOLDS = (0.9, 1.0)
+
+# Status code (index into STATUS_CATEGORIES) looked up by [spi_bucket, cpi_bucket]
+_STATUS_TABLE = np.array([
+    [2, 2, 2],
+    [2, 1, 1],
+    [2, 1, 0],
+], dtype=np.int8)
+
+def evm_kernel(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute EVM KPIs for many projects at once
+    
+    values is an (N, 4) float array of total_budget, planned_completion (%),
+    actual_completion (%) and actual_cost per project. Returns one array per
+    KPI, with status_code indexing STATUS_CATEGORIES.
+    """
+    total_budget = values[:, 0]
+    ac = values[:, 3]
+    
+    # PV and EV in one broadcast multiply: budget column times both completion columns
+    pv, ev = (values[:, :1] * (values[:, 1:3] / 100)).T
+    cpi = np.divide(ev, ac, out=np.zeros_like(ev), where=ac > 0)
+    spi = np.divide(ev, pv, out=np.zeros_like(ev), where=pv > 0)
+    cv = ev - ac
+    sv = ev - pv
+    eac = np.divide(total_budget, cpi, out=total_budget.copy(), where=cpi > 0)
+    
+    return {
+        'pv': pv,
+        'ev': ev,
+        'ac': ac,
+        'cpi': cpi,
+        'spi': spi,
+        'cv': cv,
+        'sv': sv,
+        'cost_variance_percent': np.divide(cv * 100, pv, out=np.zeros_like(cv), where=pv > 0),
+        'schedule_variance_percent': np.divide(sv * 100, pv, out=np.zeros_like(sv), where=pv > 0),
+        'status_code': _STATUS_TABLE[np.digitize(spi, _STATUS_THRESHOLDS), np.digitize(cpi, _STATUS_THRESHOLDS)],
+        'eac': eac,
+        'etc': np.where(eac > ac, eac - ac, 0.0),
+        'planned_completion': values[:, 1],
+        'actual_completion': values[:, 2],
+        'total_budget': total_budget
+    }
 
 class EVMCalculator:
     def __init__(self, data_manager: DataManager):
         self.data_manager = data_manager
     
-    def calculate_project_kpi(self, project_name: str) -> Optional[Dict]:
-        """Calculate EVM KPIs for a specific project"""
-        try:
-            # Get project info
+    def calculate_project_kpi(self, project_name: str, project_info: Optional[Dict] = None,
+                              latest_progress: Optional[ProgressRow] = None) -> Optional[Dict]:
+        """Calculate EVM KPIs for a specific project
+        
+        Missing data returns None; unexpected errors propagate to the caller.
+        """
+        # Get project info and latest progress entry (portfolio callers pass both in pre-fetched)
+        if project_info is None:
             project_info = self.data_manager.get_project_info(project_name)
-            if not project_info:
-                return None
-            
-            # Get latest progress data
-            progress_data = self.data_manager.get_progress_data(project_name)
-            if progress_data.empty:
-                return None
-            
-            # Get the latest entry
-            latest_data = progress_data.iloc[-1]
-            
-            # Calculate PV, EV, AC
-            total_budget = project_info['total_budget']
-            planned_completion = latest_data['planned_completion'] / 100
-            actual_completion = latest_data['actual_completion'] / 100
-            
-            pv = total_budget * planned_completion  # Planned Value
-            ev = total_budget * actual_completion   # Earned Value
-            ac = latest_data['actual_cost']         # Actual Cost
-            
-            # Calculate KPIs
-            cpi = ev / ac if ac > 0 else 0          # Cost Performance Index
-            spi = ev / pv if pv > 0 else 0          # Schedule Performance Index
-            cv = ev - ac                            # Cost Variance
-            sv = ev - pv                            # Schedule Variance
-            
-            # Calculate progress percentages
-            cost_variance_percent = (cv / pv * 100) if pv > 0 else 0
-            schedule_variance_percent = (sv / pv * 100) if pv > 0 else 0
-            
-            # Determine project status
-            status = self._determine_project_status(spi, cpi)
-            
-            # Calculate completion estimates
-            eac = self._calculate_eac(total_budget, cpi, actual_completion)  # Estimate at Completion
-            etc = eac - ac if eac > ac else 0                              # Estimate to Complete
-            
-            return {
-                'project_name': project_name,
-                'pv': pv,
-                'ev': ev,
-                'ac': ac,
-                'cpi': cpi,
-                'spi': spi,
-                'cv': cv,
-                'sv': sv,
-                'cost_variance_percent': cost_variance_percent,
-                'schedule_variance_percent': schedule_variance_percent,
-                'status': status,
-                'eac': eac,
-                'etc': etc,
-                'planned_completion': planned_completion * 100,
-                'actual_completion': actual_completion * 100,
-                'total_budget': total_budget
-            }
-        except Exception as e:
-            print(f"Error calculating project KPI: {e}")
+        if not project_info or project_info.get('total_budget') is None:
+            return None
+        
+        if latest_progress is None:
+            latest_progress = self.data_manager.get_latest_progress_row(project_name)
+        if latest_progress is None or None in latest_progress:
             return None
+        
+        # Calculate PV, EV, AC
+        total_budget = project_info['total_budget']
+        planned_completion = latest_progress.planned_completion / 100
+        actual_completion = latest_progress.actual_completion / 100
+        
+        pv = total_budget * planned_completion  # Planned Value
+        ev = total_budget * actual_completion   # Earned Value
+        ac = float(latest_progress.actual_cost)  # Actual Cost
+        
+        # Calculate KPIs
+        cpi = ev / ac if ac > 0 else 0          # Cost Performance Index
+        spi = ev / pv if pv > 0 else 0          # Schedule Performance Index
+        cv = ev - ac                            # Cost Variance
+        sv = ev - pv                            # Schedule Variance
+        
+        # Calculate progress percentages
+        cost_variance_percent = (cv / pv * 100) if pv > 0 else 0
+        schedule_variance_percent = (sv / pv * 100) if pv > 0 else 0
+        
+        # Determine project status
+        status = self._determine_project_status(spi, cpi)
+        
+        # Calculate completion estimates
+        eac = self._calculate_eac(total_budget, cpi, actual_completion)  # Estimate at Completion
+        etc = eac - ac if eac > ac else 0                              # Estimate to Complete
+        
+        return {
+            'project_name': project_name,
+            'pv': pv,
+            'ev': ev,
+            'ac': ac,
+            'cpi': cpi,
+            'spi': spi,
+            'cv': cv,
+            'sv': sv,
+            'cost_variance_percent': cost_variance_percent,
+            'schedule_variance_percent': schedule_variance_percent,
+            'status': status,
+            'eac': eac,
+            'etc': etc,
+            'planned_completion': planned_completion * 100,
+            'actual_completion': actual_completion * 100,
+            'total_budget': total_budget
+        }
     
-    def calculate_portfolio_kpi(self) -> Optional[Dict]:
-        """Calculate aggregated KPIs for the entire portfolio"""
+    def calculate_portfolio_kpi(self, include_details: bool = False) -> Optional[Dict]:
+        """Calculate aggregated KPIs for the entire portfolio
+        
+        Per-project rows are only converted to 'project_details' when include_details is set.
+        """
         try:
-            projects = self.data_manager.get_all_projects()
-            if not projects:
+            df = self.calculate_portfolio_frame()
+            if df.empty:
                 return None
             
-            total_pv = 0
-            total_ev = 0
-            total_ac = 0
-            valid_projects = 0
-            project_details = []
-            
-            for project in projects:
-                project_kpi = self.calculate_project_kpi(project['project_name'])
-                if project_kpi:
-                    total_pv += project_kpi['pv']
-                    total_ev += project_kpi['ev']
-                    total_ac += project_kpi['ac']
-                    valid_projects += 1
-                    project_details.append(project_kpi)
-            
-            if valid_projects == 0:
-                return None
+            valid_projects = len(df)
+            total_pv, total_ev, total_ac = (float(total) for total in df[['pv', 'ev', 'ac']].sum())
             
             # Calculate portfolio-level KPIs
             avg_cpi = total_ev / total_ac if total_ac > 0 else 0
@@ -102,14 +139,11 @@ class EVMCalculator:
             total_cv = total_ev - total_ac
             total_sv = total_ev - total_pv
             
-            # Count projects by status
-            status_counts = {'متقدم': 0, 'متأخر': 0, 'على المسار': 0}
-            for project in project_details:
-                status = project['status']
-                if status in status_counts:
-                    status_counts[status] += 1
+            # Count projects by status (Categorical counts include zero-count statuses)
+            counts = df['status'].value_counts()
+            status_counts = {status: int(counts[status]) for status in ('متقدم', 'متأخر', 'على المسار')}
             
-            return {
+            portfolio_kpi = {
                 'total_projects': valid_projects,
                 'total_pv': total_pv,
                 'total_ev': total_ev,
@@ -118,9 +152,11 @@ class EVMCalculator:
                 'avg_spi': avg_spi,
                 'total_cv': total_cv,
                 'total_sv': total_sv,
-                'status_counts': status_counts,
-                'project_details': project_details
+                'status_counts': status_counts
             }
+            if include_details:
+                portfolio_kpi['project_details'] = self._frame_to_records(df)
+            return portfolio_kpi
         except Exception as e:
             print(f"Error calculating portfolio KPI: {e}")
             return None
@@ -128,62 +164,94 @@ class EVMCalculator:
     def get_all_projects_performance(self) -> List[Dict]:
         """Get performance data for all projects"""
         try:
-            projects = self.data_manager.get_all_projects()
-            performance_data = []
+            df = self.calculate_portfolio_frame()
+            if df.empty:
+                return []
             
-            for project in projects:
-                project_kpi = self.calculate_project_kpi(project['project_name'])
-                if project_kpi:
-                    performance_data.append({
-                        'project_name': project['project_name'],
-                        'cpi': project_kpi['cpi'],
-                        'spi': project_kpi['spi'],
-                        'status': project_kpi['status'],
-                        'completion': project_kpi['actual_completion']
-                    })
-            
-            return performance_data
+            performance_df = df[['project_name', 'cpi', 'spi', 'status', 'actual_completion']]
+            return self._frame_to_records(performance_df.rename(columns={'actual_completion': 'completion'}))
         except Exception as e:
             print(f"Error getting projects performance: {e}")
             return []
     
+    def calculate_portfolio_frame(self) -> pd.DataFrame:
+        """Calculate KPIs for all projects as one DataFrame (status stored as a Categorical)"""
+        try:
+            projects_map = self.data_manager.get_projects_map()
+            latest_progress = self.data_manager.get_latest_progress_all()
+            
+            # Gather inputs column-wise; projects with missing values are skipped
+            # just like calculate_project_kpi would skip them
+            names = []
+            inputs = []
+            for project_name, project_info in projects_map.items():
+                project_latest = latest_progress.get(project_name)
+                if project_latest is None:
+                    continue
+                row = (project_info['total_budget'], *project_latest)
+                if any(value is None for value in row):
+                    continue
+                names.append(project_name)
+                inputs.append(row)
+            
+            if not names:
+                return pd.DataFrame()
+            
+            kpis = evm_kernel(np.array(inputs, dtype=np.float64))
+            
+            return pd.DataFrame({
+                'project_name': names,
+                'pv': kpis['pv'],
+                'ev': kpis['ev'],
+                'ac': kpis['ac'],
+                'cpi': kpis['cpi'],
+                'spi': kpis['spi'],
+                'cv': kpis['cv'],
+                'sv': kpis['sv'],
+                'cost_variance_percent': kpis['cost_variance_percent'],
+                'schedule_variance_percent': kpis['schedule_variance_percent'],
+                'status': pd.Categorical.from_codes(kpis['status_code'], categories=STATUS_CATEGORIES),
+                'eac': kpis['eac'],
+                'etc': kpis['etc'],
+                'planned_completion': kpis['planned_completion'],
+                'actual_completion': kpis['actual_completion'],
+                'total_budget': kpis['total_budget']
+            })
+        except Exception as e:
+            print(f"Error calculating portfolio frame: {e}")
+            return pd.DataFrame()
+    
     def get_dashboard_data(self, status_filter: str, spi_threshold: float, cpi_threshold: float) -> List[Dict]:
         """Get filtered data for dashboard"""
         try:
-            projects = self.data_manager.get_all_projects()
-            dashboard_data = []
+            df = self.calculate_portfolio_frame()
+            if df.empty:
+                return []
             
-            for project in projects:
-                project_kpi = self.calculate_project_kpi(project['project_name'])
-                if project_kpi:
-                    # Apply filters
-                    include_project = True
-                    
-                    if status_filter != "جميع المشاريع":
-                        if project_kpi['status'] != status_filter:
-                            include_project = False
-                    
-                    # Apply SPI and CPI thresholds
-                    if project_kpi['spi'] < spi_threshold or project_kpi['cpi'] < cpi_threshold:
-                        if status_filter == "على المسار":
-                            include_project = False
-                    
-                    if include_project:
-                        dashboard_data.append(project_kpi)
+            # Apply filters (status compares Categorical codes, not strings)
+            mask = pd.Series(True, index=df.index)
+            if status_filter != "جميع المشاريع":
+                mask &= df['status'] == status_filter
             
-            return dashboard_data
+            # Apply SPI and CPI thresholds
+            if status_filter == "على المسار":
+                mask &= (df['spi'] >= spi_threshold) & (df['cpi'] >= cpi_threshold)
+            
+            return self._frame_to_records(df[mask])
         except Exception as e:
             print(f"Error getting dashboard data: {e}")
             return []
     
+    def _frame_to_records(self, df: pd.DataFrame) -> List[Dict]:
+        """Convert a KPI frame to the list-of-dicts shape used by the UI and exporters"""
+        if 'status' in df.columns:
+            df = df.assign(status=df['status'].astype(str))
+        return df.to_dict('records')
+    
     def _determine_project_status(self, spi: float, cpi: float) -> str:
         """Determine project status based on SPI and CPI"""
-        if spi >= 1.0 and cpi >= 1.0:
-            return "متقدم"
-        elif spi >= 0.9 and cpi >= 0.9:
-            return "على المسار"
-        else:
-            return "متأخر"
+        status_code = _STATUS_TABLE[bisect_right(_STATUS_THRESHOLDS, spi), bisect_right(_STATUS_THRESHOLDS, cpi)]
+        return STATUS_CATEGORIES[status_code]
     
     def _calculate_eac(self, total_budget: float, cpi: float, completion_percent: float) -> float:
         """Calculate Estimate at Completion"""
@@ -198,11 +266,9 @@ class EVMCalculator:
             progress_data = self.data_manager.get_progress_data(project_name)
             if progress_data.empty or len(progress_data) < 2:
                 return None
-            
-            # Sort by date
-            progress_data['entry_date'] = pd.to_datetime(progress_data['entry_date'])
-            progress_data = progress_data.sort_values('entry_date')
-            
+
+            # Data manager returns rows already parsed and sorted by entry_date
+
             # Calculate trends
             latest_cpi = None
             latest_spi = None
@@ -245,22 +311,74 @@ class EVMCalculator:
             print(f"Error calculating trend analysis: {e}")
             return None
     
-    def _calculate_trend_direction(self, values: List[float]) -> str:
-        """Calculate trend direction from a list of values"""
-        if len(values) < 2:
-            return "مستقر"
-        
-        recent_values = values[-3:] if len(values) >= 3 else values
+    def calculate_portfolio_trends(self) -> Dict[str, Dict]:
+        """Calculate trend analysis for every project from a single progress query"""
+        try:
+            progress_data = self.data_manager.get_cash_flow_data()
+            if progress_data.empty:
+                return {}
+            
+            # Same rule as calculate_trend_analysis: at least two entries per project
+            data_points = progress_data.groupby('project_name', sort=False).size()
+            data_points = data_points[data_points >= 2]
+            progress_data = progress_data[progress_data['project_name'].isin(data_points.index)]
+            
+            # CPI/SPI for every row at once, only where a budget is defined
+            total_budget = progress_data['total_budget'].fillna(0).to_numpy(dtype=np.float64)
+            has_budget = total_budget > 0
+            pv = total_budget * progress_data['planned_completion'].to_numpy(dtype=np.float64) / 100
+            ev = total_budget * progress_data['actual_completion'].to_numpy(dtype=np.float64) / 100
+            ac = progress_data['actual_cost'].to_numpy(dtype=np.float64)
+            cpi = np.divide(ev, ac, out=np.zeros_like(ev), where=ac > 0)
+            spi = np.divide(ev, pv, out=np.zeros_like(ev), where=pv > 0)
+            
+            trend_data = pd.DataFrame({
+                'project_name': progress_data['project_name'].to_numpy(),
+                'cpi': cpi,
+                'spi': spi
+            })[has_budget]
+            
+            # Last three points per project; mean change telescopes to (last - first) / steps
+            recent = trend_data.groupby('project_name', sort=False).tail(3)
+            recent_groups = recent.groupby('project_name', sort=False)
+            first = recent_groups.head(1).set_index('project_name')
+            last = recent_groups.tail(1).set_index('project_name')
+            steps = recent_groups.size() - 1
+            avg_change = (last - first).div(steps.replace(0, np.nan), axis=0)
+            cpi_directions = self._calculate_trend_directions(avg_change['cpi'].to_numpy())
+            spi_directions = self._calculate_trend_directions(avg_change['spi'].to_numpy())
+            
+            trends = {}
+            for project_name, points in data_points.items():
+                trends[project_name] = {
+                    'latest_cpi': None,
+                    'latest_spi': None,
+                    'cpi_trend': "مستقر",
+                    'spi_trend': "مستقر",
+                    'data_points': int(points)
+                }
+            for idx, project_name in enumerate(avg_change.index):
+                trends[project_name].update({
+                    'latest_cpi': float(last.at[project_name, 'cpi']),
+                    'latest_spi': float(last.at[project_name, 'spi']),
+                    'cpi_trend': str(cpi_directions[idx]),
+                    'spi_trend': str(spi_directions[idx])
+                })
+            
+            return trends
+        except Exception as e:
+            print(f"Error calculating portfolio trends: {e}")
+            return {}
+    
+    def _calculate_trend_direction(self, values) -> str:
+        """Calculate trend direction from a list or array of values"""
+        recent_values = np.asarray(values[-3:], dtype=np.float64)
         
-        if len(recent_values) < 2:
+        if recent_values.size < 2:
             return "مستقر"
         
-        # Calculate average change
-        changes = []
-        for i in range(1, len(recent_values)):
-            changes.append(recent_values[i] - recent_values[i-1])
-        
-        avg_change = sum(changes) / len(changes)
+        # Average of consecutive changes telescopes to (last - first) / steps
+        avg_change = (recent_values[-1] - recent_values[0]) / (recent_values.size - 1)
         
         if avg_change > 0.05:
             return "تحسن"
@@ -268,3 +386,11 @@ class EVMCalculator:
             return "تراجع"
         else:
             return "مستقر"
+    
+    def _calculate_trend_directions(self, avg_changes: np.ndarray) -> np.ndarray:
+        """Map an array of average changes to trend direction labels"""
+        return np.select(
+            [avg_changes > 0.05, avg_changes < -0.05],
+            ["تحسن", "تراجع"],
+            default="مستقر"
+        )
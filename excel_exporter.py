@@ -1,15 +1,165 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import io
+import re
 import hashlib
+from collections import OrderedDict
+from copy import copy
+from itertools import islice
 from typing import Dict, List, Optional
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.worksheet.dimensions import ColumnDimension
 from data_manager import DataManager
 from evm_calculator import EVMCalculator
 
+# Plain or comma-grouped decimal numbers, parsed by float() once commas are removed
+_NUMERIC_RE = re.compile(r'^-?\d{1,3}(,\d{3})*(\.\d+)?$|^-?\d+(\.\d+)?$')
+_DIGIT_RE = re.compile(r'\d')
+# Digit-free words float() still accepts
+_FLOAT_WORDS = {'nan', 'inf', 'infinity'}
+
+# Day zero of Excel date serials and the text formats accepted in an imported template's Dates row
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+_TEMPLATE_DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y")
+
+# Characters stripped from an imported budget and from numeric template cells (incl. the Arabic thousands separator)
+_BUDGET_STRIP = str.maketrans('', '', '., ')
+_NUM_STRIP = str.maketrans('', '', ',٬')
+# Cell types converted straight to float by _template_number (bool is deliberately excluded)
+_PLAIN_NUMBER_TYPES = (int, float)
+
+# Progress notes written on import: template rows 8-14 and 17-22, keyed by the R<n> labels the reports parse
+_PROGRESS_NOTES_TEMPLATE = 'R7:{}|R8:{}|R9:{}|R10:{}|R11:{}|R12:{}|R13:{}|R17:{}|R18:{}|R19:{}|R20:{}|R21:{}|R22:{}'
+
+# Expected column-A labels (English or Arabic) of the resource rows 17-22, by 0-based row index
+_RESOURCE_HEADERS = (
+    (16, ["Date", "تاريخ"]),  # Row 17
+    (17, ["Budgeted Labor Units Weekly", "العمالة الأسبوعية"]),  # Row 18
+    (18, ["Budgeted Nonlabor Units Weekly", "المعدات الأسبوعية"]),  # Row 19
+    (19, ["Date", "تاريخ"]),  # Row 20
+    (20, ["Budgeted Labor Units Monthly", "العمالة الشهرية"]),  # Row 21
+    (21, ["Budgeted Nonlabor Units Monthly", "المعدات الشهرية"])  # Row 22
+)
+
+# Template rows 3 and 4: (label, value cell) pairs, laid out label/value/spacer from column A
+_TEMPLATE_FIELD_ROWS = (
+    (("Project Name:", 'B3'), ("Project ID:", 'E3'), ("Start Date:", 'H3'),
+     ("End Date:", 'K3'), ("Planned Total Cost:", 'N3')),
+    (("Contractor:", 'B4'), ("Project Manager (Water Administration):", 'E4')),
+)
+
+# Column letters for columns 1..2001 (the widest template), looked up as _COL_LETTERS[col - 1]
+_COL_LETTERS = tuple(get_column_letter(col) for col in range(1, 2002))
+
+# Shared styles for the worksheet data table and budget table helpers
+_HEADER_FONT = Font(bold=True, size=11, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="3498db", end_color="3498db", fill_type="solid")
+_BUDGET_HEADER_FILL = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+_BUDGET_DATA_FILL = PatternFill(start_color="ecf0f1", end_color="ecf0f1", fill_type="solid")
+_DATE_FILL = PatternFill(start_color="e8f5e8", end_color="e8f5e8", fill_type="solid")
+_NUMBER_FILL = PatternFill(start_color="f0f0f0", end_color="f0f0f0", fill_type="solid")
+_CENTER_ALIGN = Alignment(horizontal='center', vertical='center')
+_LEFT_ALIGN = Alignment(horizontal='left', vertical='center')
+_RIGHT_ALIGN = Alignment(horizontal='right', vertical='center')
+_ROW_NUMBER_FONT = Font(bold=True, color="34495e")
+_THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+# Styles for the generated project template sheets
+_TEMPLATE_TITLE_FONT = Font(bold=True, size=12, color="FFFFFF")
+_TEMPLATE_TITLE_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+_FIELD_FONT = Font(bold=True, size=10)
+_FIELD_FILL = PatternFill(start_color="D9E2F3", end_color="D9E2F3", fill_type="solid")
+
+# Named styles registered on each exported workbook: name -> (number format, alignment)
+_NAMED_STYLE_SPECS = {
+    'currency_ar': ('#,##0.00', _RIGHT_ALIGN),
+    'currency': ('#,##0.00', None)
+}
+
+def _is_blank(value) -> bool:
+    """Whether a cell value read with values_only is empty (None or a float NaN)
+    
+    openpyxl hands back plain scalars, so this is much cheaper than pd.isna per cell.
+    """
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _template_number(value, default=0):
+    """Convert an imported template cell to a float
+    
+    Blank cells and unparsable text give default; text may carry thousands separators
+    or a trailing '%'. Datetimes (the resource date rows) are returned as they are.
+    """
+    # Plain numbers, the common case, skip the type checks below (NaN still falls through to default)
+    if value.__class__ in _PLAIN_NUMBER_TYPES and value == value:
+        return float(value)
+    
+    if _is_blank(value) or value == '':
+        return default
+    
+    if isinstance(value, str):
+        # Remove thousands separators and handle Arabic/English numbers
+        clean_value = value.strip().translate(_NUM_STRIP)
+        try:
+            return float(clean_value.replace('%', '').strip() if '%' in clean_value else clean_value)
+        except ValueError:
+            return default
+    
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value
+    
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class _WidthTracker:
+    """Track the longest text per column while rows are prepared, then size the columns once"""
+    
+    def __init__(self):
+        self.max_lengths = {}
+    
+    def update(self, col_idx: int, value) -> None:
+        """Record a value written to a 1-based column (None is ignored)"""
+        if value is not None:
+            length = len(str(value))
+            if length > self.max_lengths.get(col_idx, 0):
+                self.max_lengths[col_idx] = length
+    
+    def update_row(self, row) -> None:
+        """Record every value of a row starting at column A"""
+        for col_idx, value in enumerate(row, 1):
+            self.update(col_idx, value)
+    
+    def update_table(self, table) -> None:
+        """Record a DataFrame or 2-D array starting at column A, measured in one vectorized pass"""
+        if len(table):
+            table_lengths = np.char.str_len(np.asarray(table).astype(str)).max(axis=0)
+            for col_idx, length in enumerate(table_lengths.tolist(), 1):
+                if length > self.max_lengths.get(col_idx, 0):
+                    self.max_lengths[col_idx] = length
+    
+    def apply(self, ws) -> None:
+        """Set the tracked widths (capped at 50) on a worksheet"""
+        for col_idx, max_length in self.max_lengths.items():
+            ws.column_dimensions[_COL_LETTERS[col_idx - 1]].width = min(max_length + 2, 50)
+
 class ExcelExporter:
+    # Parsed rows of recently exported original files, shared across exporter instances
+    ORIGINAL_CACHE_SIZE = 4
+    _original_rows_cache = OrderedDict()
+    
     def __init__(self, data_manager: DataManager):
         self.data_manager = data_manager
         self.evm_calculator = EVMCalculator(data_manager)
@@ -23,19 +173,25 @@ class ExcelExporter:
             if cash_flow_data.empty:
                 return None
             
-            # Process the data for reporting
-            cash_flow_data['entry_date'] = pd.to_datetime(cash_flow_data['entry_date'])
-            cash_flow_data = cash_flow_data.sort_values('entry_date')
-            
-            # Calculate cumulative values
-            cash_flow_data['cumulative_planned'] = cash_flow_data['planned_cost'].cumsum()
-            cash_flow_data['cumulative_actual'] = cash_flow_data['actual_cost'].cumsum()
-            cash_flow_data['variance'] = cash_flow_data['actual_cost'] - cash_flow_data['planned_cost']
-            cash_flow_data['cumulative_variance'] = cash_flow_data['variance'].cumsum()
-            
-            # Format for display
-            report_data = cash_flow_data[['entry_date', 'planned_cost', 'actual_cost', 'variance', 
-                                        'cumulative_planned', 'cumulative_actual', 'cumulative_variance']]
+            # Process the data for reporting (rows of one project already come back in date order)
+            self._parse_entry_dates(cash_flow_data)
+            if len(cash_flow_data) > 1 and not cash_flow_data['entry_date'].is_monotonic_increasing:
+                cash_flow_data = cash_flow_data.sort_values('entry_date')
+            
+            planned = cash_flow_data['planned_cost'].to_numpy(dtype=np.float64)
+            actual = cash_flow_data['actual_cost'].to_numpy(dtype=np.float64)
+            totals = self._cumulative_cash_flow(planned, actual)
+            
+            # Build the display frame once, columns already in report order
+            report_data = pd.DataFrame({
+                'entry_date': cash_flow_data['entry_date'].to_numpy(),
+                'planned_cost': planned,
+                'actual_cost': actual,
+                'variance': totals['variance'],
+                'cumulative_planned': totals['cumulative_planned'],
+                'cumulative_actual': totals['cumulative_actual'],
+                'cumulative_variance': totals['cumulative_variance']
+            }, copy=False)
             
             return report_data
         except Exception as e:
@@ -45,94 +201,95 @@ class ExcelExporter:
     def generate_portfolio_cash_flow_report(self, start_date: date, end_date: date) -> Optional[pd.DataFrame]:
         """Generate cash flow report for the entire portfolio"""
         try:
-            cash_flow_data = self.data_manager.get_cash_flow_data(None, start_date, end_date)
+            cash_flow_data = self.data_manager.get_cash_flow_data(None, start_date, end_date, sort_by_date=True)
             
             if cash_flow_data.empty:
                 return None
             
-            # Group by date and sum across all projects
-            cash_flow_data['entry_date'] = pd.to_datetime(cash_flow_data['entry_date'])
-            grouped_data = cash_flow_data.groupby('entry_date').agg({
-                'planned_cost': 'sum',
-                'actual_cost': 'sum'
-            }).reset_index()
+            # Sum across all projects per date: rows arrive date-ordered, so reduce each run of equal dates
+            self._parse_entry_dates(cash_flow_data)
+            if len(cash_flow_data) > 1 and not cash_flow_data['entry_date'].is_monotonic_increasing:
+                cash_flow_data = cash_flow_data.sort_values('entry_date', kind='stable')
+            dates, starts = np.unique(cash_flow_data['entry_date'].to_numpy(), return_index=True)
             
-            grouped_data = grouped_data.sort_values('entry_date')
+            # Missing costs count as zero, as they did with groupby().sum()
+            planned = np.add.reduceat(np.nan_to_num(cash_flow_data['planned_cost'].to_numpy(dtype=np.float64)), starts)
+            actual = np.add.reduceat(np.nan_to_num(cash_flow_data['actual_cost'].to_numpy(dtype=np.float64)), starts)
             
             # Calculate cumulative values and variance
-            grouped_data['cumulative_planned'] = grouped_data['planned_cost'].cumsum()
-            grouped_data['cumulative_actual'] = grouped_data['actual_cost'].cumsum()
-            grouped_data['variance'] = grouped_data['actual_cost'] - grouped_data['planned_cost']
-            grouped_data['cumulative_variance'] = grouped_data['variance'].cumsum()
-            
-            return grouped_data
+            totals = self._cumulative_cash_flow(planned, actual)
+            
+            return pd.DataFrame({
+                'entry_date': dates,
+                'planned_cost': planned,
+                'actual_cost': actual,
+                'cumulative_planned': totals['cumulative_planned'],
+                'cumulative_actual': totals['cumulative_actual'],
+                'variance': totals['variance'],
+                'cumulative_variance': totals['cumulative_variance']
+            }, copy=False)
         except Exception as e:
             print(f"Error generating portfolio cash flow report: {e}")
             return None
     
+    def _parse_entry_dates(self, cash_flow_data: pd.DataFrame) -> None:
+        """Parse entry_date in place unless the data manager already returned datetimes"""
+        if not pd.api.types.is_datetime64_any_dtype(cash_flow_data['entry_date']):
+            cash_flow_data['entry_date'] = pd.to_datetime(cash_flow_data['entry_date'])
+    
+    def _cumulative_cash_flow(self, planned: np.ndarray, actual: np.ndarray) -> Dict[str, np.ndarray]:
+        """Compute running totals and variance for date-ordered planned/actual cost arrays"""
+        variance = actual - planned
+        return {
+            'cumulative_planned': np.cumsum(planned),
+            'cumulative_actual': np.cumsum(actual),
+            'variance': variance,
+            'cumulative_variance': np.cumsum(variance)
+        }
+    
     def export_cash_flow_to_excel(self, data: pd.DataFrame, project_name: str, start_date: date, end_date: date) -> Optional[bytes]:
         """Export cash flow data to Excel format"""
         try:
-            # Create workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "تقرير التدفق النقدي"
+            # Write-only workbook streams rows out instead of keeping every cell in memory
+            wb = Workbook(write_only=True)
+            self._add_named_styles(wb)
+            ws = wb.create_sheet("تقرير التدفق النقدي")
             
             # Set Arabic text alignment
             arabic_alignment = Alignment(horizontal='right', vertical='center')
             header_font = Font(bold=True, size=12)
             header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
             
-            # Add title
-            ws['A1'] = f"تقرير التدفق النقدي - {project_name if project_name != 'جميع المشاريع' else 'المحفظة الكاملة'}"
-            ws['A1'].font = Font(bold=True, size=14)
-            ws['A1'].alignment = arabic_alignment
-            ws.merge_cells('A1:G1')
-            
-            # Add date range
-            ws['A2'] = f"من {start_date} إلى {end_date}"
-            ws['A2'].alignment = arabic_alignment
-            ws.merge_cells('A2:G2')
-            
-            # Add headers
+            title = f"تقرير التدفق النقدي - {project_name if project_name != 'جميع المشاريع' else 'المحفظة الكاملة'}"
+            date_range = f"من {start_date} إلى {end_date}"
             headers = ['التاريخ', 'التكلفة المخططة', 'التكلفة الفعلية', 'الانحراف', 
                       'التكلفة المخططة التراكمية', 'التكلفة الفعلية التراكمية', 'الانحراف التراكمي']
             
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = arabic_alignment
-            
-            # Add data
-            for row_idx, (_, row) in enumerate(data.iterrows(), 5):
-                ws.cell(row=row_idx, column=1, value=row['entry_date'].strftime('%Y-%m-%d'))
-                ws.cell(row=row_idx, column=2, value=row['planned_cost'])
-                ws.cell(row=row_idx, column=3, value=row['actual_cost'])
-                ws.cell(row=row_idx, column=4, value=row['variance'])
-                ws.cell(row=row_idx, column=5, value=row['cumulative_planned'])
-                ws.cell(row=row_idx, column=6, value=row['cumulative_actual'])
-                ws.cell(row=row_idx, column=7, value=row['cumulative_variance'])
-                
-                # Apply formatting
-                for col in range(1, 8):
-                    cell = ws.cell(row=row_idx, column=col)
-                    cell.alignment = arabic_alignment
-                    if col > 1:  # Format currency columns
-                        cell.number_format = '#,##0.00'
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            # Format all dates in one pass and pull the amounts out as a single array
+            value_columns = ['planned_cost', 'actual_cost', 'variance',
+                             'cumulative_planned', 'cumulative_actual', 'cumulative_variance']
+            dates = data['entry_date'].dt.strftime('%Y-%m-%d').to_numpy(dtype=str)
+            values = data[value_columns].to_numpy(dtype=np.float64)
+            data_rows = [[entry_date, *row] for entry_date, row in zip(dates.tolist(), values.tolist())]
+            
+            # Column widths have to be known before the first row is streamed
+            self._set_column_widths(ws, [[title], [date_range], headers],
+                                    table=np.column_stack((dates, values.astype(str))))
+            
+            # Add title and date range
+            ws.append([self._styled_cell(ws, title, font=Font(bold=True, size=14), alignment=arabic_alignment)])
+            ws.merged_cells.add('A1:G1')
+            ws.append([self._styled_cell(ws, date_range, alignment=arabic_alignment)])
+            ws.merged_cells.add('A2:G2')
+            ws.append([])
+            
+            # Add headers and data (currency format on every column after the date)
+            currency_style = {'style': 'currency_ar'}
+            self._write_tabular(
+                ws, headers, data_rows,
+                header_style={'font': header_font, 'fill': header_fill, 'alignment': arabic_alignment},
+                column_styles=[{'alignment': arabic_alignment}] + [currency_style] * 6
+            )
             
             # Add worksheets data table to the export
             self._add_worksheets_data_table(wb)
@@ -150,27 +307,20 @@ class ExcelExporter:
     def export_portfolio_kpi_to_excel(self, kpi_data: Dict) -> Optional[bytes]:
         """Export portfolio KPI data to Excel format"""
         try:
-            wb = Workbook()
+            # Write-only workbook streams rows out instead of keeping every cell in memory
+            wb = Workbook(write_only=True)
+            self._add_named_styles(wb)
             
             # Overview sheet
-            ws_overview = wb.active
-            ws_overview.title = "ملخص المحفظة"
+            ws_overview = wb.create_sheet("ملخص المحفظة")
             
             # Formatting
             arabic_alignment = Alignment(horizontal='right', vertical='center')
             header_font = Font(bold=True, size=12)
             title_font = Font(bold=True, size=14)
             
-            # Title
-            ws_overview['A1'] = "تقرير مؤشرات أداء المحفظة"
-            ws_overview['A1'].font = title_font
-            ws_overview['A1'].alignment = arabic_alignment
-            ws_overview.merge_cells('A1:D1')
-            
-            # Date
-            ws_overview['A2'] = f"تاريخ التقرير: {datetime.now().strftime('%Y-%m-%d')}"
-            ws_overview['A2'].alignment = arabic_alignment
-            ws_overview.merge_cells('A2:D2')
+            title = "تقرير مؤشرات أداء المحفظة"
+            report_date = f"تاريخ التقرير: {datetime.now().strftime('%Y-%m-%d')}"
             
             # KPI Summary
             kpi_data_rows = [
@@ -184,35 +334,56 @@ class ExcelExporter:
                 ['انحراف الجدولة الإجمالي (SV)', kpi_data.get('total_sv', 0)]
             ]
             
-            # Add KPI data
-            start_row = 4
-            for idx, (label, value) in enumerate(kpi_data_rows):
-                row = start_row + idx
-                ws_overview.cell(row=row, column=1, value=label).alignment = arabic_alignment
-                ws_overview.cell(row=row, column=1).font = header_font
-                
+            # Column widths are tracked while the rows are prepared
+            widths = _WidthTracker()
+            widths.update(1, title)
+            widths.update(1, report_date)
+            
+            # Index values are shown as 3-decimal text, amounts keep a currency format
+            overview_rows = []
+            for label, value in kpi_data_rows:
+                value_style = None
                 if isinstance(value, (int, float)):
                     if 'مؤشر' in label or 'CPI' in label or 'SPI' in label:
-                        ws_overview.cell(row=row, column=2, value=f"{value:.3f}")
+                        value = f"{value:.3f}"
                     else:
-                        ws_overview.cell(row=row, column=2, value=value)
-                        ws_overview.cell(row=row, column=2).number_format = '#,##0.00'
-                else:
-                    ws_overview.cell(row=row, column=2, value=value)
-                
-                ws_overview.cell(row=row, column=2).alignment = arabic_alignment
+                        value_style = 'currency_ar'
+                overview_rows.append((label, value, value_style))
+                widths.update_row((label, value))
             
             # Status distribution
             status_counts = kpi_data.get('status_counts', {})
-            if status_counts:
-                status_start_row = start_row + len(kpi_data_rows) + 2
-                ws_overview.cell(row=status_start_row, column=1, value="توزيع حالات المشاريع").font = title_font
-                ws_overview.cell(row=status_start_row, column=1).alignment = arabic_alignment
-                
-                for idx, (status, count) in enumerate(status_counts.items()):
-                    row = status_start_row + idx + 1
-                    ws_overview.cell(row=row, column=1, value=status).alignment = arabic_alignment
-                    ws_overview.cell(row=row, column=2, value=count).alignment = arabic_alignment
+            status_rows = list(status_counts.items()) if status_counts else []
+            status_title = "توزيع حالات المشاريع"
+            if status_rows:
+                widths.update(1, status_title)
+                for status_row in status_rows:
+                    widths.update_row(status_row)
+            widths.apply(ws_overview)
+            
+            # Title and date
+            ws_overview.append([self._styled_cell(ws_overview, title, font=title_font, alignment=arabic_alignment)])
+            ws_overview.merged_cells.add('A1:D1')
+            ws_overview.append([self._styled_cell(ws_overview, report_date, alignment=arabic_alignment)])
+            ws_overview.merged_cells.add('A2:D2')
+            ws_overview.append([])
+            
+            # Add KPI data
+            for label, value, value_style in overview_rows:
+                ws_overview.append([
+                    self._styled_cell(ws_overview, label, font=header_font, alignment=arabic_alignment),
+                    self._styled_cell(ws_overview, value, style=value_style, alignment=arabic_alignment)
+                ])
+            
+            if status_rows:
+                ws_overview.append([])
+                ws_overview.append([])
+                ws_overview.append([self._styled_cell(ws_overview, status_title, font=title_font, alignment=arabic_alignment)])
+                for status, count in status_rows:
+                    ws_overview.append([
+                        self._styled_cell(ws_overview, status, alignment=arabic_alignment),
+                        self._styled_cell(ws_overview, count, alignment=arabic_alignment)
+                    ])
             
             # Project details sheet
             if 'project_details' in kpi_data and kpi_data['project_details']:
@@ -221,35 +392,21 @@ class ExcelExporter:
                 # Headers
                 project_headers = ['اسم المشروع', 'القيمة المخططة (PV)', 'القيمة المكتسبة (EV)', 
                                  'التكلفة الفعلية (AC)', 'مؤشر CPI', 'مؤشر SPI', 'الحالة']
-                
-                for col, header in enumerate(project_headers, 1):
-                    cell = ws_projects.cell(row=1, column=col, value=header)
-                    cell.font = header_font
-                    cell.alignment = arabic_alignment
+                project_rows = [
+                    (project['project_name'], project['pv'], project['ev'], project['ac'],
+                     f"{project['cpi']:.3f}", f"{project['spi']:.3f}", project['status'])
+                    for project in kpi_data['project_details']
+                ]
+                self._set_column_widths(ws_projects, [project_headers] + project_rows)
                 
                 # Project data
-                for row_idx, project in enumerate(kpi_data['project_details'], 2):
-                    ws_projects.cell(row=row_idx, column=1, value=project['project_name']).alignment = arabic_alignment
-                    ws_projects.cell(row=row_idx, column=2, value=project['pv']).number_format = '#,##0.00'
-                    ws_projects.cell(row=row_idx, column=3, value=project['ev']).number_format = '#,##0.00'
-                    ws_projects.cell(row=row_idx, column=4, value=project['ac']).number_format = '#,##0.00'
-                    ws_projects.cell(row=row_idx, column=5, value=f"{project['cpi']:.3f}")
-                    ws_projects.cell(row=row_idx, column=6, value=f"{project['spi']:.3f}")
-                    ws_projects.cell(row=row_idx, column=7, value=project['status']).alignment = arabic_alignment
-            
-            # Auto-adjust column widths for all sheets
-            for ws in wb.worksheets:
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    ws.column_dimensions[column_letter].width = adjusted_width
+                currency_style = {'style': 'currency'}
+                self._write_tabular(
+                    ws_projects, project_headers, project_rows,
+                    header_style={'font': header_font, 'alignment': arabic_alignment},
+                    column_styles=[{'alignment': arabic_alignment}] + [currency_style] * 3 +
+                                  [None, None, {'alignment': arabic_alignment}]
+                )
             
             # Add worksheets data table to the export
             self._add_worksheets_data_table(wb)
@@ -264,8 +421,205 @@ class ExcelExporter:
             print(f"Error exporting KPI to Excel: {e}")
             return None
     
+    def _styled_cell(self, ws, value, font=None, fill=None, alignment=None, border=None,
+                     number_format=None, style: Optional[str] = None) -> WriteOnlyCell:
+        """Create a write-only cell carrying the given styles (a named style is applied first)"""
+        cell = WriteOnlyCell(ws, value=value)
+        if style is not None:
+            cell.style = style
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if alignment is not None:
+            cell.alignment = alignment
+        if border is not None:
+            cell.border = border
+        if number_format is not None:
+            cell.number_format = number_format
+        return cell
+    
+    def _add_named_styles(self, wb) -> None:
+        """Register the shared named styles on a workbook
+        
+        NamedStyle objects bind to a single workbook, so fresh ones are built from the specs each time.
+        """
+        for name, (number_format, alignment) in _NAMED_STYLE_SPECS.items():
+            named_style = NamedStyle(name=name, number_format=number_format)
+            if alignment is not None:
+                named_style.alignment = alignment
+            wb.add_named_style(named_style)
+    
+    def _write_tabular(self, ws, header_row: List, data_rows: List, header_style: Optional[Dict] = None,
+                       column_styles: Optional[List[Optional[Dict]]] = None) -> None:
+        """Append a header row and data rows to a write-only sheet, styling whole columns at once
+        
+        Each column's style is resolved once on a template cell and then shared by every
+        data cell in that column, instead of re-resolving font/fill/format per cell.
+        """
+        ws.append([self._styled_cell(ws, header, **(header_style or {})) for header in header_row])
+        
+        column_styles = column_styles or []
+        templates = [
+            self._styled_cell(ws, None, **style) if style else None
+            for style in column_styles
+        ]
+        
+        for row in data_rows:
+            cells = []
+            for col_idx, value in enumerate(row):
+                template = templates[col_idx] if col_idx < len(templates) else None
+                cells.append(value if template is None else self._cell_like(ws, value, template))
+            ws.append(cells)
+    
+    def _cell_like(self, ws, value, template) -> WriteOnlyCell:
+        """Create a write-only cell sharing the already-resolved style of a template cell
+        
+        The value is bound after the style is copied so date values still get a date format.
+        """
+        cell = WriteOnlyCell(ws)
+        cell._style = copy(template._style)
+        cell.value = value
+        return cell
+    
+    def _set_column_widths(self, ws, rows: List, table=None) -> None:
+        """Size columns to their longest value (capped at 50) from the data being written
+        
+        rows holds the few title/header rows; table is the optional bulk data (a DataFrame
+        or 2-D array starting at column A) whose text lengths are measured in one pass.
+        """
+        widths = _WidthTracker()
+        for row in rows:
+            widths.update_row(row)
+        if table is not None:
+            widths.update_table(table)
+        widths.apply(ws)
+    
+    def _get_original_rows(self, file_content: bytes, content_hash: Optional[str] = None) -> tuple:
+        """Get the first 30 non-empty rows (up to 50 columns) of the original file's first worksheet
+        
+        Results are cached by content hash; pass the hash stored with the file to skip rehashing it.
+        """
+        if not content_hash:
+            content_hash = hashlib.blake2b(file_content, digest_size=16).hexdigest()
+        cache = ExcelExporter._original_rows_cache
+        if content_hash in cache:
+            cache.move_to_end(content_hash)
+            return cache[content_hash]
+        
+        import openpyxl
+        from io import BytesIO
+        
+        # Read-only mode streams rows from the file instead of building every cell
+        original_wb = openpyxl.load_workbook(BytesIO(file_content), data_only=True, read_only=True)
+        try:
+            if not original_wb.worksheets:
+                return ()  # No worksheets to process
+            
+            # Get first worksheet from original file, skipping empty rows and
+            # stopping once the 30 rows shown in the export have been read
+            original_ws = original_wb.worksheets[0]
+            max_col = min(50, original_ws.max_column or 50)
+            rows = original_ws.iter_rows(max_col=max_col, values_only=True)
+            data = tuple(islice(
+                (row for row in rows if row and any(cell is not None for cell in row)), 30
+            ))
+        finally:
+            original_wb.close()
+        
+        cache[content_hash] = data
+        if len(cache) > self.ORIGINAL_CACHE_SIZE:
+            cache.popitem(last=False)
+        return data
+    
+    def _coerce_date_values(self, values: List) -> List:
+        """Convert data-table values to (value, number_format) pairs formatted as dates"""
+        # Classify every value in one pass; exact built-in types are checked by identity
+        # first, isinstance only catches subclasses such as bool or NumPy scalars
+        result = []
+        serial_idx = []
+        text_idx = []
+        for idx, value in enumerate(values):
+            value_type = type(value)
+            if value is None:
+                result.append(("", None))
+            elif value_type is int or value_type is float or isinstance(value, (int, float)):
+                serial_idx.append(idx)
+                result.append((value, None))
+            elif value_type is str or isinstance(value, str):
+                text_idx.append(idx)
+                result.append((value, None))
+            elif hasattr(value, 'date'):
+                # Anything else with a date (e.g. datetime objects) is kept as is
+                result.append((value, 'DD-MM-YYYY'))
+            else:
+                result.append((value, None))
+        
+        # Excel serial numbers: one vectorized day offset from the 1899-12-30 epoch,
+        # limited to day counts a pandas Timedelta can represent
+        if serial_idx:
+            serials = np.array([values[idx] for idx in serial_idx], dtype=np.float64)
+            days = np.trunc(np.nan_to_num(serials, nan=0.0, posinf=0.0, neginf=0.0))
+            valid = np.isfinite(serials) & (np.abs(days) <= pd.Timedelta.max.days)
+            days = np.where(valid, days, 0).astype(np.int64)
+            dates = (np.datetime64('1899-12-30') + days.astype('timedelta64[D]')).tolist()
+            for idx, is_valid, date_val in zip(serial_idx, valid.tolist(), dates):
+                result[idx] = (date_val, 'DD-MM-YYYY') if is_valid else (str(values[idx]), None)
+        
+        # Text: parse all strings in one call, falling back to per-cell parsing
+        if text_idx:
+            texts = [values[idx] for idx in text_idx]
+            try:
+                parsed = pd.to_datetime(pd.Series(texts, dtype=object), errors='coerce', format='mixed').tolist()
+            except Exception:
+                parsed = [pd.to_datetime(text, errors='coerce') for text in texts]
+            for idx, text, date_val in zip(text_idx, texts, parsed):
+                result[idx] = (date_val.date(), 'DD-MM-YYYY') if pd.notna(date_val) else (text, None)
+        
+        return result
+    
+    def _coerce_number_row(self, values: List) -> List:
+        """Convert a data-table row to (value, number_format) pairs formatted as numbers"""
+        result = []
+        numeric_idx = []
+        for idx, value in enumerate(values):
+            value_type = type(value)
+            if value is None:
+                result.append(("", None))
+            elif value_type is float or value_type is int or isinstance(value, (int, float)):
+                # Exact built-in numbers match by identity before the isinstance fallback
+                numeric_idx.append(idx)
+                result.append((value, None))
+            else:
+                text = str(value)
+                if _NUMERIC_RE.match(text):
+                    numeric_idx.append(idx)
+                    result.append((float(text.replace(',', '')), None))
+                elif not _DIGIT_RE.search(text) and text.strip().lstrip('+-').lower() not in _FLOAT_WORDS:
+                    # Labels without digits can never parse, skip the failing float() call
+                    result.append((text if value else "", None))
+                else:
+                    # Try to convert to number
+                    try:
+                        result.append((float(text.replace(',', '')), None))
+                        numeric_idx.append(idx)
+                    except (TypeError, ValueError):
+                        result.append((text if value else "", None))
+        
+        # Pick integer vs decimal format for every numeric cell in one pass
+        if numeric_idx:
+            numbers = np.array([result[idx][0] for idx in numeric_idx], dtype=np.float64)
+            is_integer = np.isfinite(numbers) & (numbers == np.trunc(numbers))
+            for idx, integer in zip(numeric_idx, is_integer.tolist()):
+                result[idx] = (result[idx][0], '0' if integer else '0.00')
+        
+        return result
+    
     def _add_worksheets_data_table(self, workbook) -> None:
-        """Add a worksheet containing all worksheet data with proper formatting"""
+        """Add a worksheet containing all worksheet data with proper formatting
+        
+        The workbook is expected to be in write-only mode, so rows are appended in order.
+        """
         try:
             # Get the latest original Excel file
             original_file_data = self.data_manager.get_latest_original_excel_file()
@@ -273,222 +627,144 @@ class ExcelExporter:
             if not original_file_data or not original_file_data.get('file_content'):
                 return  # No original file to reference
             
-            import openpyxl
-            from io import BytesIO
+            # Read data from the original Excel file (parsed once per distinct file)
+            data = self._get_original_rows(original_file_data['file_content'], original_file_data.get('file_hash'))
             
-            # Read the original Excel file
-            file_content = original_file_data['file_content']
-            original_wb = openpyxl.load_workbook(BytesIO(file_content), data_only=True)
+            if not data:
+                return  # No data to process
             
-            if not original_wb.worksheets:
-                return  # No worksheets to process
+            # Get maximum columns with data (already limited to 50 when read)
+            max_cols = max(len(row) for row in data)
             
             # Create new worksheet in the export workbook
             ws_data = workbook.create_sheet("جدول أوراق العمل الكاملة")
             
-            # Formatting
-            header_font = Font(bold=True, size=11, color="FFFFFF")
-            header_fill = PatternFill(start_color="3498db", end_color="3498db", fill_type="solid")
-            date_fill = PatternFill(start_color="e8f5e8", end_color="e8f5e8", fill_type="solid")
-            number_fill = PatternFill(start_color="f0f0f0", end_color="f0f0f0", fill_type="solid")
-            center_alignment = Alignment(horizontal='center', vertical='center')
-            right_alignment = Alignment(horizontal='right', vertical='center')
-            
-            # Border
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Add title and file info
-            ws_data['A1'] = "جدول أوراق العمل الكاملة - Complete Worksheets Data"
-            ws_data['A1'].font = Font(bold=True, size=14)
-            ws_data['A1'].alignment = right_alignment
-            ws_data.merge_cells('A1:AX1')  # Merge across many columns
-            
-            ws_data['A2'] = f"الملف الأصلي: {original_file_data.get('file_name', 'غير محدد')} - تاريخ الاستيراد: {original_file_data.get('imported_date', 'غير محدد')}"
-            ws_data['A2'].font = Font(size=10, color="7f8c8d")
-            ws_data['A2'].alignment = right_alignment
-            ws_data.merge_cells('A2:AX2')
-            
-            # Get first worksheet from original file
-            original_ws = original_wb.worksheets[0]
-            
-            # Read data from original worksheet
-            data = []
-            for row in original_ws.iter_rows(values_only=True):
-                if row and any(cell is not None for cell in row):  # Skip empty rows
-                    data.append(row)
-            
-            if not data:
-                return  # No data to process
-            
-            # Get maximum columns with data (limit to 50 for export)
-            max_cols = min(50, max(len(row) for row in data if row))
+            # One template cell per (fill, number format) pair, shared by every data cell using it
+            templates = {}
             
-            # Header row with column letters
-            header_row = 4  # Start after title and info
-            ws_data.cell(row=header_row, column=1, value="رقم الصف").font = header_font
-            ws_data.cell(row=header_row, column=1).fill = header_fill
-            ws_data.cell(row=header_row, column=1).alignment = right_alignment
-            ws_data.cell(row=header_row, column=1).border = thin_border
+            # Column widths (must be set before any row is written)
+            for col_idx in range(1, max_cols + 2):
+                col_letter = _COL_LETTERS[col_idx - 1]
+                if col_idx == 1:
+                    ws_data.column_dimensions[col_letter].width = 12  # Row number column
+                else:
+                    ws_data.column_dimensions[col_letter].width = 10  # Data columns
             
+            # Add title and file info
+            ws_data.append([self._styled_cell(
+                ws_data, "جدول أوراق العمل الكاملة - Complete Worksheets Data",
+                font=Font(bold=True, size=14), alignment=_RIGHT_ALIGN
+            )])
+            ws_data.merged_cells.add('A1:AX1')  # Merge across many columns
+            
+            ws_data.append([self._styled_cell(
+                ws_data,
+                f"الملف الأصلي: {original_file_data.get('file_name', 'غير محدد')} - تاريخ الاستيراد: {original_file_data.get('imported_date', 'غير محدد')}",
+                font=Font(size=10, color="7f8c8d"), alignment=_RIGHT_ALIGN
+            )])
+            ws_data.merged_cells.add('A2:AX2')
+            ws_data.append([])
+            
+            # Header row with column letters (row 4)
+            header_cells = [self._styled_cell(ws_data, "رقم الصف", font=_HEADER_FONT, fill=_HEADER_FILL,
+                                              alignment=_RIGHT_ALIGN, border=_THIN_BORDER)]
             for col_idx in range(max_cols):
-                col_letter = openpyxl.utils.get_column_letter(col_idx + 1)
-                cell = ws_data.cell(row=header_row, column=col_idx + 2, value=col_letter)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_alignment
-                cell.border = thin_border
-            
-            # Data rows (limit to first 30 rows for export)
-            for row_idx, row_data in enumerate(data[:30]):
+                col_letter = _COL_LETTERS[col_idx]
+                header_cells.append(self._styled_cell(ws_data, col_letter, font=_HEADER_FONT, fill=_HEADER_FILL,
+                                                      alignment=_CENTER_ALIGN, border=_THIN_BORDER))
+            ws_data.append(header_cells)
+            
+            # Rows padded to the table width
+            padded_rows = [list(row[:max_cols]) + [None] * (max_cols - len(row)) for row in data]
+            
+            # Date rows (21-24) are converted together in one vectorized pass
+            date_row_numbers = list(range(21, min(24, len(data)) + 1))
+            coerced_dates = self._coerce_date_values(
+                [value for row_number in date_row_numbers for value in padded_rows[row_number - 1]]
+            )
+            date_rows = {
+                row_number: coerced_dates[idx * max_cols:(idx + 1) * max_cols]
+                for idx, row_number in enumerate(date_row_numbers)
+            }
+            
+            # Data rows (first 30 rows of the original, read that way)
+            for row_idx, row_values in enumerate(padded_rows):
                 if row_idx == 0:
                     continue  # Skip first row (usually headers)
                 
-                excel_row = header_row + row_idx
                 actual_row_number = row_idx + 1
                 
                 # Row number column
-                row_cell = ws_data.cell(row=excel_row, column=1, value=actual_row_number)
-                row_cell.font = Font(bold=True, color="34495e")
-                row_cell.alignment = center_alignment
-                row_cell.border = thin_border
+                row_cells = [self._styled_cell(ws_data, actual_row_number, font=_ROW_NUMBER_FONT,
+                                               alignment=_CENTER_ALIGN, border=_THIN_BORDER)]
                 
                 # Determine if this is a date row (21-24)
                 is_date_row = 21 <= actual_row_number <= 24
                 
-                # Fill row data
-                for col_idx in range(max_cols):
-                    cell_value = row_data[col_idx] if col_idx < len(row_data) else None
-                    cell = ws_data.cell(row=excel_row, column=col_idx + 2)
-                    
-                    if cell_value is not None:
-                        if is_date_row:
-                            # Format as date for rows 21-24
-                            try:
-                                if isinstance(cell_value, (int, float)):
-                                    # Excel date number
-                                    date_val = pd.to_datetime('1899-12-30') + pd.Timedelta(days=int(cell_value))
-                                    cell.value = date_val.date()
-                                    cell.number_format = 'DD-MM-YYYY'
-                                elif isinstance(cell_value, str):
-                                    # Try to parse as date
-                                    date_val = pd.to_datetime(cell_value, errors='coerce')
-                                    if pd.notna(date_val):
-                                        cell.value = date_val.date()
-                                        cell.number_format = 'DD-MM-YYYY'
-                                    else:
-                                        cell.value = str(cell_value)
-                                else:
-                                    cell.value = cell_value
-                                    if hasattr(cell_value, 'date'):
-                                        cell.number_format = 'DD-MM-YYYY'
-                            except:
-                                cell.value = str(cell_value) if cell_value else ""
-                            
-                            cell.fill = date_fill
-                            
-                        else:
-                            # Format as number for other rows
-                            try:
-                                if isinstance(cell_value, (int, float)):
-                                    cell.value = cell_value
-                                    if float(cell_value).is_integer():
-                                        cell.number_format = '0'
-                                    else:
-                                        cell.number_format = '0.00'
-                                else:
-                                    # Try to convert to number
-                                    try:
-                                        num_val = float(str(cell_value).replace(',', ''))
-                                        cell.value = num_val
-                                        if num_val.is_integer():
-                                            cell.number_format = '0'
-                                        else:
-                                            cell.number_format = '0.00'
-                                    except:
-                                        cell.value = str(cell_value) if cell_value else ""
-                            except:
-                                cell.value = str(cell_value) if cell_value else ""
-                            
-                            cell.fill = number_fill
-                    else:
-                        cell.value = ""
-                        cell.fill = number_fill if not is_date_row else date_fill
-                    
-                    cell.alignment = center_alignment
-                    cell.border = thin_border
-            
-            # Add legend at the bottom
-            legend_row = header_row + min(30, len(data)) + 2
-            ws_data.cell(row=legend_row, column=1, value="ملاحظات:").font = Font(bold=True)
-            ws_data.cell(row=legend_row, column=1).alignment = right_alignment
-            
-            ws_data.cell(row=legend_row + 1, column=1, value="• الصفوف 21-24: منسقة كتواريخ")
-            ws_data.cell(row=legend_row + 1, column=1).alignment = right_alignment
-            ws_data.cell(row=legend_row + 1, column=1).fill = date_fill
-            
-            ws_data.cell(row=legend_row + 2, column=1, value="• الصفوف الأخرى: منسقة كأرقام")
-            ws_data.cell(row=legend_row + 2, column=1).alignment = right_alignment
-            ws_data.cell(row=legend_row + 2, column=1).fill = number_fill
-            
-            # Auto-adjust column widths
-            for col_idx in range(1, max_cols + 2):
-                col_letter = openpyxl.utils.get_column_letter(col_idx)
-                if col_idx == 1:
-                    ws_data.column_dimensions[col_letter].width = 12  # Row number column
+                # Coerce the whole row at once, then style each cell
+                if is_date_row:
+                    coerced = date_rows[actual_row_number]
+                    row_fill = _DATE_FILL
                 else:
-                    ws_data.column_dimensions[col_letter].width = 10  # Data columns
+                    coerced = self._coerce_number_row(row_values)
+                    row_fill = _NUMBER_FILL
+                
+                for value, number_format in coerced:
+                    template = templates.get((is_date_row, number_format))
+                    if template is None:
+                        template = self._styled_cell(ws_data, None, fill=row_fill, alignment=_CENTER_ALIGN,
+                                                     border=_THIN_BORDER, number_format=number_format)
+                        templates[(is_date_row, number_format)] = template
+                    row_cells.append(self._cell_like(ws_data, value, template))
+                
+                ws_data.append(row_cells)
+            
+            # Add legend two rows below the data
+            ws_data.append([])
+            ws_data.append([])
+            ws_data.append([self._styled_cell(ws_data, "ملاحظات:", font=Font(bold=True), alignment=_RIGHT_ALIGN)])
+            ws_data.append([self._styled_cell(ws_data, "• الصفوف 21-24: منسقة كتواريخ",
+                                              alignment=_RIGHT_ALIGN, fill=_DATE_FILL)])
+            ws_data.append([self._styled_cell(ws_data, "• الصفوف الأخرى: منسقة كأرقام",
+                                              alignment=_RIGHT_ALIGN, fill=_NUMBER_FILL)])
                     
         except Exception as e:
             print(f"Error adding worksheets data table: {e}")
             # Don't fail the entire export if this fails
             pass
 
+    def _find_data_extent(self, ws) -> tuple:
+        """Find the last row and last column that hold a value
+        
+        Walks up from ws.max_row and left from ws.max_column, stopping at the first
+        non-empty row/column, instead of scanning every cell of the sheet.
+        """
+        last_row = 1
+        for row in range(ws.max_row, 0, -1):
+            values = next(ws.iter_rows(min_row=row, max_row=row, values_only=True))
+            if any(value is not None for value in values):
+                last_row = row
+                break
+        
+        last_col = 1
+        for col in range(ws.max_column, 0, -1):
+            values = next(ws.iter_cols(min_col=col, max_col=col, max_row=last_row, values_only=True))
+            if any(value is not None for value in values):
+                last_col = col
+                break
+        
+        return last_row, last_col
+    
     def _add_new_budget_table_to_existing_sheets(self, workbook) -> None:
         """Add new budget table below existing data in each worksheet"""
         try:
-            import openpyxl
-            from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-            
-            print(f"DEBUG - Starting to add budget table to {len(workbook.worksheets)} worksheets")
             # Process each worksheet in the workbook
-            for ws_idx, ws in enumerate(workbook.worksheets):
-                print(f"DEBUG - Processing worksheet {ws_idx + 1}: {ws.title}")
+            for ws in workbook.worksheets:
                 # Find the last row with data
-                last_row = 1
-                for row in range(1, ws.max_row + 1):
-                    if any(ws.cell(row, col).value is not None for col in range(1, ws.max_column + 1)):
-                        last_row = row
+                last_row, upper_table_max_col = self._find_data_extent(ws)
                 
                 # Start adding the table 3 rows below the last data
                 start_row = last_row + 3
-                print(f"DEBUG - Adding budget table to worksheet '{ws.title}' starting at row {start_row}")
-                
-                # Formatting
-                header_font = Font(bold=True, size=11, color="FFFFFF")
-                header_fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
-                data_fill = PatternFill(start_color="ecf0f1", end_color="ecf0f1", fill_type="solid")
-                center_alignment = Alignment(horizontal='center', vertical='center')
-                
-                # Border
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                
-                # Find how many columns the upper table has (to match the span)
-                upper_table_max_col = 1
-                for col in range(1, ws.max_column + 1):
-                    if any(ws.cell(row, col).value is not None for row in range(1, last_row + 1)):
-                        upper_table_max_col = col
-                
-                print(f"DEBUG - Upper table spans {upper_table_max_col} columns")
                 
                 # Define row headers (what used to be column headers)
                 row_headers = [
@@ -506,10 +782,10 @@ class ExcelExporter:
                     
                     # Add row header in first column
                     header_cell = ws.cell(row=current_row, column=1, value=header)
-                    header_cell.font = header_font
-                    header_cell.fill = header_fill
-                    header_cell.alignment = center_alignment
-                    header_cell.border = thin_border
+                    header_cell.font = _HEADER_FONT
+                    header_cell.fill = _BUDGET_HEADER_FILL
+                    header_cell.alignment = _CENTER_ALIGN
+                    header_cell.border = _THIN_BORDER
                     
                     # Set column width for header column
                     ws.column_dimensions['A'].width = max(ws.column_dimensions['A'].width or 8, 30)
@@ -517,17 +793,17 @@ class ExcelExporter:
                     # Fill data cells across all columns to match upper table span
                     for col_idx in range(2, upper_table_max_col + 1):
                         data_cell = ws.cell(row=current_row, column=col_idx)
-                        data_cell.fill = data_fill
-                        data_cell.alignment = center_alignment
-                        data_cell.border = thin_border
+                        data_cell.fill = _BUDGET_DATA_FILL
+                        data_cell.alignment = _CENTER_ALIGN
+                        data_cell.border = _THIN_BORDER
                         
                         # Set format based on row type
                         if "Date" in header:
                             data_cell.number_format = 'DD-MM-YYYY'
                         else:
                             data_cell.number_format = '0.00'
-                
-                print(f"DEBUG - Successfully added budget table to worksheet '{ws.title}'")
+            
+            print(f"DEBUG - Added budget table to {len(workbook.worksheets)} worksheets")
                 
         except Exception as e:
             print(f"Error adding budget table to existing sheets: {e}")
@@ -537,23 +813,13 @@ class ExcelExporter:
     def _remove_third_table_from_all_sheets(self, workbook) -> None:
         """حذف الجدول الثالث من جميع أوراق العمل (الصفوف 25-30)"""
         try:
-            print(f"DEBUG - حذف الجدول الثالث من {len(workbook.worksheets)} ورقة عمل")
-            
             # معالجة كل ورقة عمل في الكتاب
-            for ws_idx, ws in enumerate(workbook.worksheets):
-                print(f"DEBUG - معالجة ورقة العمل {ws_idx + 1}: {ws.title}")
-                
-                # حذف الصفوف 25-30 (الجدول الثالث)
-                # حذف من الأسفل إلى الأعلى لتجنب مشاكل الفهرسة
-                for row_num in range(30, 24, -1):  # من 30 إلى 25
-                    try:
-                        ws.delete_rows(row_num)
-                        print(f"DEBUG - تم حذف الصف {row_num} من ورقة '{ws.title}'")
-                    except Exception as e:
-                        print(f"DEBUG - خطأ في حذف الصف {row_num}: {e}")
-                        continue
-                
-                print(f"DEBUG - تم حذف الجدول الثالث من ورقة '{ws.title}' بنجاح")
+            for ws in workbook.worksheets:
+                # حذف الصفوف 25-30 (الجدول الثالث) دفعة واحدة
+                # حتى تُزاح خلايا الورقة مرة واحدة فقط بدلاً من ست مرات
+                ws.delete_rows(idx=25, amount=6)
+            
+            print(f"DEBUG - تم حذف الجدول الثالث من {len(workbook.worksheets)} ورقة عمل")
                 
         except Exception as e:
             print(f"خطأ في حذف الجدول الثالث من أوراق العمل: {e}")
@@ -599,12 +865,16 @@ class ExcelExporter:
             # Return None to indicate no template available - user needs to import first
             return None
     
-    def _generate_new_template(self, existing_projects: List = None) -> Optional[bytes]:
-        """Generate new project template Excel file matching the required table format with multiple sheets"""
+    def _generate_new_template(self, existing_projects: List = None) -> Optional[io.BytesIO]:
+        """Generate new project template Excel file matching the required table format with multiple sheets
+        
+        The workbook is built in write-only mode: every row is streamed out with ws.append,
+        so the 2000-column grid never sits in memory as individual Cell objects. The saved
+        file is returned as the rewound buffer itself; callers that need bytes can call
+        getvalue(), others can stream it without a second full-size copy.
+        """
         try:
-            from openpyxl.utils import get_column_letter
-            
-            wb = Workbook()
+            wb = Workbook(write_only=True)
             
             # Ensure we always have at least 40 sheets
             if not existing_projects:
@@ -614,10 +884,12 @@ class ExcelExporter:
                 while len(existing_projects) < 40:
                     existing_projects.append(None)
             
-            # Remove the default sheet
-            wb.remove(wb.active)
+            # Fetch every project's progress in one query rather than once per sheet
+            progress_map = self.data_manager.get_progress_data_bulk(
+                [project['project_name'] for project in existing_projects if project]
+            )
             
-            # Create a sheet for each project
+            # Create a sheet for each project (write-only workbooks have no default sheet)
             for project_idx, project in enumerate(existing_projects):
                 # Create sheet name in format [number].[project_code] but limit to 31 characters for Excel
                 if project and project.get('project_id'):
@@ -637,76 +909,49 @@ class ExcelExporter:
                     
                 ws = wb.create_sheet(title=sheet_name)
                 
-                # Formatting
-                header_font = Font(bold=True, size=12, color="FFFFFF")
-                field_font = Font(bold=True, size=10)
-                data_font = Font(size=10)
-                header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-                field_fill = PatternFill(start_color="D9E2F3", end_color="D9E2F3", fill_type="solid")
-                center_alignment = Alignment(horizontal='center', vertical='center')
-                left_alignment = Alignment(horizontal='left', vertical='center')
-                
-                # Border
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                
-                # Main Header
-                ws.merge_cells('A1:O1')
-                header_cell = ws['A1']
-                header_cell.value = "Project Management Data Template - Abdullah Al-Saeed Engineering Consulting Company"
-                header_cell.font = header_font
-                header_cell.fill = header_fill
-                header_cell.alignment = center_alignment
-                
-                # Project information fields (row 3)
-                ws['A3'].value = "Project Name:"
-                ws['A3'].font = field_font
-                ws['A3'].alignment = left_alignment
-                
-                ws['D3'].value = "Project ID:"
-                ws['D3'].font = field_font
-                ws['D3'].alignment = left_alignment
-                
-                ws['G3'].value = "Start Date:"
-                ws['G3'].font = field_font
-                ws['G3'].alignment = left_alignment
-                
-                ws['J3'].value = "End Date:"
-                ws['J3'].font = field_font
-                ws['J3'].alignment = left_alignment
-                
-                ws['M3'].value = "Planned Total Cost:"
-                ws['M3'].font = field_font
-                ws['M3'].alignment = left_alignment
-                
-                # Additional fields (row 4)
-                ws['A4'].value = "Contractor:"
-                ws['A4'].font = field_font
-                ws['A4'].alignment = left_alignment
-                
-                ws['D4'].value = "Project Manager (Water Administration):"
-                ws['D4'].font = field_font
-                ws['D4'].alignment = left_alignment
+                # Adjust column widths to match the image layout (must precede the first append)
+                ws.column_dimensions['A'].width = 25  # Row headers column
+                # The 2000 data columns (B to BXL) share one width, so a single
+                # <col min="2" max="2001"> entry covers them all
+                ws.column_dimensions['B'] = ColumnDimension(ws, index='B', min=2, max=2001, width=12)
+                
+                # Main Header (row 1)
+                ws.append([self._styled_cell(
+                    ws, "Project Management Data Template - Abdullah Al-Saeed Engineering Consulting Company",
+                    font=_TEMPLATE_TITLE_FONT, fill=_TEMPLATE_TITLE_FILL, alignment=_CENTER_ALIGN
+                )])
+                ws.merged_cells.add('A1:O1')
+                ws.append([])
                 
                 # Fill in project data if available
                 if project:
-                    ws['B3'].value = project.get('project_name', '')
-                    ws['E3'].value = project.get('project_id', f"P{project_idx + 1:03d}")
-                    ws['H3'].value = project.get('start_date', '')
-                    ws['K3'].value = project.get('end_date', '')
-                    ws['N3'].value = project.get('total_budget', '')
-                    # Additional data fields
-                    ws['B4'].value = project.get('contractor_name', '')
-                    ws['E4'].value = project.get('project_manager', '')
+                    project_values = {
+                        'B3': project.get('project_name', ''),
+                        'E3': project.get('project_id', f"P{project_idx + 1:03d}"),
+                        'H3': project.get('start_date', ''),
+                        'K3': project.get('end_date', ''),
+                        'N3': project.get('total_budget', ''),
+                        # Additional data fields
+                        'B4': project.get('contractor_name', ''),
+                        'E4': project.get('project_manager', '')
+                    }
                 else:
-                    ws['B3'].value = f"[Enter Project Name]"
-                    ws['E3'].value = f"P{project_idx + 1:03d}"
-                    ws['B4'].value = "[Enter Contractor Name]"
-                    ws['E4'].value = "[Enter Project Manager]"
+                    project_values = {
+                        'B3': f"[Enter Project Name]",
+                        'E3': f"P{project_idx + 1:03d}",
+                        'B4': "[Enter Contractor Name]",
+                        'E4': "[Enter Project Manager]"
+                    }
+                
+                # Project information fields (row 3) and additional fields (row 4): each label
+                # is followed by its value and a blank spacer column
+                label_cell = self._styled_cell(ws, None, font=_FIELD_FONT, alignment=_LEFT_ALIGN)
+                for fields in _TEMPLATE_FIELD_ROWS:
+                    row_cells = []
+                    for label, value_key in fields:
+                        row_cells.extend([self._cell_like(ws, label, label_cell), project_values.get(value_key), None])
+                    ws.append(row_cells[:-1])
+                ws.append([])
                 
                 # Set up the table structure with row headers (moved down to row 6)
                 row_headers = [
@@ -720,132 +965,101 @@ class ExcelExporter:
                     'Actual'
                 ]
                 
-                # Create header row for the table (row 6)
-                ws['A6'].value = ''  # Empty top-left cell
-                ws['A6'].font = field_font
-                ws['A6'].fill = field_fill
-                ws['A6'].border = thin_border
-                
-                # Add column headers (B6 to BXL6) - 2000 columns for dates
-                for col in range(2, 2002):  # Columns B to BXL (2000 columns)
-                    col_letter = get_column_letter(col)
-                    cell = ws[f'{col_letter}6']
-                    cell.font = field_font
-                    cell.fill = field_fill
-                    cell.alignment = center_alignment
-                    cell.border = thin_border
-                
-                # Add row headers and create the grid structure (starting from row 7)
-                for i, header in enumerate(row_headers):
-                    row_num = 7 + i
-                    cell = ws[f'A{row_num}']
-                    cell.value = header
-                    cell.font = field_font
-                    cell.fill = field_fill
-                    cell.alignment = left_alignment
-                    cell.border = thin_border
-                    
-                    # Create bordered cells for data entry - 2000 columns
-                    for col in range(2, 2002):  # Columns B to BXL (2000 columns)
-                        col_letter = get_column_letter(col)
-                        data_cell = ws[f'{col_letter}{row_num}']
-                        data_cell.border = thin_border
-                        data_cell.alignment = center_alignment
-                        
-                        # Special formatting for the Dates row
-                        if header == 'Dates':
-                            data_cell.font = field_font
+                # Create header row for the table (row 6). Only cells that hold a value are
+                # written: pre-styling 2000 empty columns per row bloated the file without
+                # adding data, so the date columns B6 to BXL6 stay blank.
+                ws.append([self._styled_cell(ws, '', font=_FIELD_FONT, fill=_FIELD_FILL, border=_THIN_BORDER)])
                 
-                # Fill in existing project data if available
+                # Existing progress values keyed by sheet row: {row_num: [value per column]}
+                grid_values = {}
                 if project:
-                    progress_data = self.data_manager.get_progress_data(project['project_name'])
+                    progress_data = progress_map.get(project['project_name'], pd.DataFrame())
                     if not progress_data.empty:
                         # Sort by date and limit to available columns
                         progress_data = progress_data.sort_values('entry_date')
                         
-                        for col_idx, (_, row_data) in enumerate(progress_data.iterrows()):
-                            if col_idx >= 2000:  # Limit to available columns (B to BXL = 2000 columns)
-                                break
-                                
-                            col_letter = get_column_letter(col_idx + 2)  # Start from column B
-                            
-                            # Fill data in each row
-                            # ws[f'{col_letter}6'].value = row_data['entry_date']  # Dates - تم حذف هذا السطر لعدم الحاجة للتواريخ الوهمية
-                            
-                            # Extract data from notes field if available
-                            notes = row_data.get('notes', '')
-                            
-                            # Helper function to extract value from notes
-                            def extract_from_notes(notes_str, row_key):
-                                try:
-                                    if f'{row_key}:' in notes_str:
-                                        value_str = notes_str.split(f'{row_key}:')[1].split('|')[0]
-                                        return float(value_str) if value_str and value_str != 'None' else 0
-                                    return 0
-                                except:
-                                    return 0
-                            
-                            # Extract values from notes
-                            r7_value = extract_from_notes(notes, 'R7')  # Planned Total Cost
-                            r8_value = extract_from_notes(notes, 'R8')  # Cum Budgeted Total Cost
-                            r9_value = extract_from_notes(notes, 'R9')  # Planned % daily
-                            r10_value = extract_from_notes(notes, 'R10')  # Cum % daily
-                            r11_value = extract_from_notes(notes, 'R11')  # The elapsed period %
-                            r12_value = extract_from_notes(notes, 'R12')  # The elapsed period
-                            r13_value = extract_from_notes(notes, 'R13')  # Actual
-                            
-                            # Fill rows with proper formatting
-                            # Row 7: Planned Total Cost (number format)
-                            cell_7 = ws[f'{col_letter}7']
-                            cell_7.value = r7_value
-                            cell_7.number_format = '#,##0.00'
-                            
-                            # Row 8: Cum Budgeted Total Cost (number format)
-                            cell_8 = ws[f'{col_letter}8']
-                            cell_8.value = r8_value
-                            cell_8.number_format = '#,##0.00'
-                            
-                            # Row 9: Planned % daily (number format as requested)
-                            cell_9 = ws[f'{col_letter}9']
-                            cell_9.value = r9_value
-                            cell_9.number_format = '#,##0.00'
-                            
-                            # Row 10: Cum % daily (percentage format)
-                            cell_10 = ws[f'{col_letter}10']
-                            cell_10.value = r10_value / 100 if r10_value > 1 else r10_value
-                            cell_10.number_format = '0.00%'
-                            
-                            # Row 11: The elapsed period % (percentage format)
-                            cell_11 = ws[f'{col_letter}11']
-                            cell_11.value = r11_value / 100 if r11_value > 1 else r11_value
-                            cell_11.number_format = '0.00%'
-                            
-                            # Row 12: The elapsed period (number format)
-                            cell_12 = ws[f'{col_letter}12']
-                            cell_12.value = r12_value
-                            cell_12.number_format = '#,##0.00'
-                            
-                            # Row 13: Actual (number format)
-                            cell_13 = ws[f'{col_letter}13']
-                            cell_13.value = r13_value
-                            cell_13.number_format = '#,##0.00'
-                
-                # Adjust column widths to match the image layout
-                ws.column_dimensions['A'].width = 25  # Row headers column
-                for col in range(2, 2002):  # 2000 data columns
-                    col_letter = get_column_letter(col)
-                    ws.column_dimensions[col_letter].width = 12  # Data columns
-            
-            # Save to bytes
+                        # Limit to available columns (B to BXL = 2000 columns)
+                        notes = progress_data['notes'].head(2000)
+                        
+                        # Extract each row's values from all notes at once: the text after
+                        # 'R<n>:' up to the next '|', with missing or non-numeric values as 0
+                        note_rows = {
+                            7: 'R7',  # Planned Total Cost
+                            8: 'R8',  # Cum Budgeted Total Cost
+                            9: 'R9',  # Planned % daily
+                            10: 'R10',  # Cum % daily
+                            11: 'R11',  # The elapsed period %
+                            12: 'R12',  # The elapsed period
+                            13: 'R13'  # Actual
+                        }
+                        for row_num, row_key in note_rows.items():
+                            raw = notes.str.extract(rf'{row_key}:([^|]*)', expand=False)
+                            # to_numeric only flags the parsable entries: its fast parser can drop
+                            # trailing digits, so the values themselves come from astype
+                            parsable = pd.to_numeric(raw, errors='coerce').notna()
+                            values = np.zeros(len(raw))
+                            values[parsable.to_numpy()] = raw[parsable].astype(np.float64).to_numpy()
+                            # Percentages stored as 0-100 are scaled down to fractions
+                            if row_num in (10, 11):
+                                values = np.where(values > 1, values / 100, values)
+                            grid_values[row_num] = values.tolist()
+                
+                # Number format per filled row: percentages for rows 10-11, numbers elsewhere
+                row_formats = {10: '0.00%', 11: '0.00%'}
+                
+                # Add row headers and any existing data (starting from row 7)
+                for i, header in enumerate(row_headers):
+                    row_num = 7 + i
+                    row_cells = [self._styled_cell(ws, header, font=_FIELD_FONT, fill=_FIELD_FILL,
+                                                   alignment=_LEFT_ALIGN, border=_THIN_BORDER)]
+                    
+                    values = grid_values.get(row_num)
+                    if values:
+                        # Special formatting for the Dates row
+                        value_cell = self._styled_cell(ws, None, font=_FIELD_FONT if header == 'Dates' else None,
+                                                       alignment=_CENTER_ALIGN, border=_THIN_BORDER,
+                                                       number_format=row_formats.get(row_num, '#,##0.00'))
+                        # Zero values are left as blank cells; the import reads blanks as 0
+                        row_cells.extend(self._cell_like(ws, value, value_cell) if value else None for value in values)
+                    ws.append(row_cells)
+            
+            # Save to an in-memory buffer, returned as is
             excel_buffer = io.BytesIO()
             wb.save(excel_buffer)
             excel_buffer.seek(0)
             
-            return excel_buffer.getvalue()
+            return excel_buffer
         except Exception as e:
             print(f"Error exporting project template: {e}")
             return None
     
+    def _parse_template_date(self, date_value):
+        """Convert a Dates-row cell of an imported template to a datetime (NaT if unparsable)
+        
+        Cells are dispatched on type so the common cases avoid pandas' scalar parser:
+        datetimes pass through, Excel serials are offset from the epoch and text tries
+        the template's formats with strptime before falling back to pandas inference.
+        """
+        if isinstance(date_value, datetime):
+            return date_value
+        if isinstance(date_value, str):
+            for date_format in _TEMPLATE_DATE_FORMATS:
+                try:
+                    return datetime.strptime(date_value, date_format)
+                except ValueError:
+                    continue
+            return pd.to_datetime(date_value, errors="coerce")
+        if isinstance(date_value, (int, float)):
+            # Excel stores dates as day numbers counted from 1899-12-30
+            try:
+                days = int(date_value)
+            except (OverflowError, ValueError):
+                return pd.NaT
+            if abs(days) <= pd.Timedelta.max.days:
+                return _EXCEL_EPOCH + timedelta(days=days)
+            return pd.to_datetime(date_value, errors="coerce")
+        return pd.to_datetime(date_value)
+    
     def import_project_template(self, uploaded_file) -> Dict:
         """Import project data from uploaded Excel template with table format"""
         error_details = []  # Track specific errors
@@ -862,9 +1076,9 @@ class ExcelExporter:
                     'error_details': ['نوع الملف غير مدعوم - يجب أن يكون ملف Excel']
                 }
             
-            # Read the Excel file with multiple sheets
+            # Open the workbook once in read-only mode; each sheet's rows are streamed from it
             try:
-                wb = pd.ExcelFile(uploaded_file)
+                wb = load_workbook(uploaded_file, read_only=True, data_only=True)
             except Exception as e:
                 return {
                     'success': False,
@@ -877,9 +1091,12 @@ class ExcelExporter:
             success_count = 0
             updated_count = 0
             imported_projects = []
+            new_projects = []
+            imported_sheets = []  # (project name, sheet rows, row count, sheet width) per project to import progress for
             
             # Validate that we have sheets to process
-            if not wb.sheet_names:
+            if not wb.sheetnames:
+                wb.close()
                 return {
                     'success': False,
                     'imported_count': 0,
@@ -893,7 +1110,7 @@ class ExcelExporter:
                 # Reset file pointer to beginning
                 uploaded_file.seek(0)
                 file_content = uploaded_file.read()
-                file_hash = hashlib.md5(file_content).hexdigest()
+                file_hash = hashlib.blake2b(file_content, digest_size=16).hexdigest()
                 
                 # Reset file pointer again for processing
                 uploaded_file.seek(0)
@@ -907,61 +1124,78 @@ class ExcelExporter:
             # Clear all existing projects before importing new ones
             print("DEBUG - Clearing all existing projects before import")
             try:
+                # This also clears the saved original Excel files
                 self.data_manager.clear_all_data()
-                # Also clear original Excel files
-                self.data_manager.clear_original_excel_files()
             except Exception as e:
                 error_details.append(f'فشل في مسح البيانات السابقة: {str(e)}')
             
             # Process each sheet in order to maintain sheet order
-            for sheet_index, sheet_name in enumerate(wb.sheet_names):
-                wb_data = pd.read_excel(uploaded_file, sheet_name=sheet_name, engine='openpyxl', header=None)
+            for sheet_index, ws in enumerate(wb.worksheets):
+                sheet_name = ws.title
+                
+                # Read only the project name in B3 first; unfilled template sheets are skipped
+                # before the rest of the sheet is loaded
+                name_row = list(ws.iter_rows(min_row=3, max_row=3, min_col=2, max_col=2, values_only=True))
+                if not name_row:
+                    continue  # Sheet has no project row
+                project_name_cell = str(name_row[0][0]).strip() if not _is_blank(name_row[0][0]) else ""
+                if ":" in project_name_cell:
+                    project_name = project_name_cell.split(":", 1)[1].strip()
+                else:
+                    project_name = project_name_cell
                 
-                # Extract project information from row 3 (index 2)
-                if len(wb_data) > 2:
-                    # Get project name from B3
-                    project_name_cell = str(wb_data.iloc[2, 1]).strip() if not pd.isna(wb_data.iloc[2, 1]) else ""
-                    if ":" in project_name_cell:
-                        project_name = project_name_cell.split(":", 1)[1].strip()
-                    else:
-                        project_name = project_name_cell
+                # Skip empty or placeholder project names
+                if not project_name or project_name == "[Enter Project Name]":
+                    warnings.append(f'تم تجاهل الورقة "{sheet_name}" - لا يوجد اسم مشروع صحيح')
+                    continue  # Skip this sheet and continue with next
                 
-                    # Skip empty or placeholder project names
-                    if not project_name or project_name == "[Enter Project Name]":
-                        warnings.append(f'تم تجاهل الورقة "{sheet_name}" - لا يوجد اسم مشروع صحيح')
-                        print(f"DEBUG - Skipping sheet {sheet_name} - no valid project name found: '{project_name}'")
-                        continue  # Skip this sheet and continue with next
-                    
+                # Only rows 1-22 (project fields, progress table, resource rows) up to column BXL are used;
+                # cells are read as plain row tuples, wb_data[row][col]
+                wb_data = list(ws.iter_rows(min_row=1, max_row=22, max_col=2001, values_only=True))
+                sheet_rows = len(wb_data)
+                sheet_width = len(wb_data[0]) if wb_data else 0
+                
+                # Extract project information from row 3 (index 2)
+                if sheet_rows > 2:
                     # Get project ID from E3 cell (column 4, row 3)
-                    raw_project_id = str(wb_data.iloc[2, 4]).strip() if len(wb_data.columns) > 4 and not pd.isna(wb_data.iloc[2, 4]) else f"P001"
+                    raw_project_id = str(wb_data[2][4]).strip() if sheet_width > 4 and not _is_blank(wb_data[2][4]) else f"P001"
                     # Extract only the project code part (before any " - " or additional text)
                     if " - " in raw_project_id:
                         project_id = raw_project_id.split(" - ")[0].strip()
                     else:
                         project_id = raw_project_id
-                    start_date_str = str(wb_data.iloc[2, 7]).strip() if len(wb_data.columns) > 7 and not pd.isna(wb_data.iloc[2, 7]) else ""
-                    end_date_str = str(wb_data.iloc[2, 10]).strip() if len(wb_data.columns) > 10 and not pd.isna(wb_data.iloc[2, 10]) else ""
-                    total_budget_str = str(wb_data.iloc[2, 13]).strip() if len(wb_data.columns) > 13 and not pd.isna(wb_data.iloc[2, 13]) else "0"
+                    start_date_cell = wb_data[2][7] if sheet_width > 7 else None
+                    end_date_cell = wb_data[2][10] if sheet_width > 10 else None
+                    start_date_str = str(start_date_cell).strip() if not _is_blank(start_date_cell) else ""
+                    end_date_str = str(end_date_cell).strip() if not _is_blank(end_date_cell) else ""
+                    total_budget_str = str(wb_data[2][13]).strip() if sheet_width > 13 and not _is_blank(wb_data[2][13]) else "0"
                     
                     # Get additional fields (row 4) - contractor and project manager
-                    contractor_name = str(wb_data.iloc[3, 1]).strip() if len(wb_data) > 3 and not pd.isna(wb_data.iloc[3, 1]) else ""
-                    project_manager = str(wb_data.iloc[3, 4]).strip() if len(wb_data) > 3 and not pd.isna(wb_data.iloc[3, 4]) else ""
+                    contractor_name = str(wb_data[3][1]).strip() if sheet_rows > 3 and not _is_blank(wb_data[3][1]) else ""
+                    project_manager = str(wb_data[3][4]).strip() if sheet_rows > 3 and not _is_blank(wb_data[3][4]) else ""
                     
-                    # Parse dates and budget with error handling
+                    # Parse dates and budget with error handling; date cells read in data_only
+                    # mode are already datetimes, so only text values go through pandas
                     try:
-                        start_date = pd.to_datetime(start_date_str).date() if start_date_str and start_date_str.lower() != 'nan' else datetime.now().date()
+                        if isinstance(start_date_cell, datetime):
+                            start_date = start_date_cell.date()
+                        else:
+                            start_date = pd.to_datetime(start_date_str).date() if start_date_str and start_date_str.lower() != 'nan' else datetime.now().date()
                     except Exception as e:
                         warnings.append(f'تاريخ البداية غير صحيح في المشروع {project_name}: {start_date_str}')
                         start_date = datetime.now().date()
                     
                     try:
-                        end_date = pd.to_datetime(end_date_str).date() if end_date_str and end_date_str.lower() != 'nan' else datetime.now().date()
+                        if isinstance(end_date_cell, datetime):
+                            end_date = end_date_cell.date()
+                        else:
+                            end_date = pd.to_datetime(end_date_str).date() if end_date_str and end_date_str.lower() != 'nan' else datetime.now().date()
                     except Exception as e:
                         warnings.append(f'تاريخ الانتهاء غير صحيح في المشروع {project_name}: {end_date_str}')
                         end_date = datetime.now().date()
                     
                     try:
-                        clean_budget = total_budget_str.replace('.', '').replace(',', '').replace(' ', '') if isinstance(total_budget_str, str) else str(total_budget_str)
+                        clean_budget = total_budget_str.translate(_BUDGET_STRIP) if isinstance(total_budget_str, str) else str(total_budget_str)
                         total_budget = float(clean_budget) if clean_budget and clean_budget.replace('-', '').isdigit() else 0
                     except Exception as e:
                         warnings.append(f'الميزانية غير صحيحة في المشروع {project_name}: {total_budget_str}')
@@ -985,329 +1219,194 @@ class ExcelExporter:
                         'created_date': datetime.now()
                     }
                 
-                    # Add new project (since we cleared all existing projects)
-                    if self.data_manager.add_project(project_data):
-                        success_count += 1
-                
-                        imported_projects.append({'project_name': project_name, 'project_id': project_id, 'status': 'new', 'start_date': start_date, 'end_date': end_date, 'total_budget': total_budget})
-                        current_project_name = project_name
-                        print(f"DEBUG - Successfully added project {project_name}")
-                    else:
-                        print(f"DEBUG - Failed to add project {project_name}")
-                        continue  # Skip this sheet and continue with next
+                    # Projects are stored together once every sheet has been read
+                    new_projects.append(project_data)
+                    imported_projects.append({'project_name': project_name, 'project_id': project_id, 'status': 'new', 'start_date': start_date, 'end_date': end_date, 'total_budget': total_budget})
+                    imported_sheets.append((project_name, wb_data, sheet_rows, sheet_width))
+            
+            wb.close()
+            
+            # Add new projects in a single transaction (since we cleared all existing projects)
+            if self.data_manager.add_projects_bulk(new_projects):
+                success_count = len(new_projects)
+                print(f"DEBUG - Successfully added {success_count} projects")
+            else:
+                print(f"DEBUG - Failed to add {len(new_projects)} projects")
+                imported_projects = []
+                imported_sheets = []
+            
+            for current_project_name, wb_data, sheet_rows, sheet_width in imported_sheets:
+                # Now import progress data from the table (moved down to row 7 due to additional fields)
+                # Look for the dates row (row 7, index 6) and get the column data 
+                if sheet_rows > 6:
+                    # Entries are collected per sheet and stored in one transaction
+                    progress_entries = []
+                    # Convert the value rows 8-14 once per sheet instead of cell by cell per date;
+                    # _template_number already strips "%" from the percentage rows 10-12
+                    value_rows = [
+                        [_template_number(value) for value in wb_data[row_idx]] if sheet_rows > row_idx else [0] * sheet_width
+                        for row_idx in range(7, 14)
+                    ]
                     
-                    # Now import progress data from the table (moved down to row 7 due to additional fields)
-                    # Look for the dates row (row 7, index 6) and get the column data 
-                    if len(wb_data) > 6:
-                        for col_idx in range(1, min(2001, len(wb_data.columns))):  # Columns B to BXL (2000 columns)
-                            # Get date from row 7 (Dates row) - force date format
-                            date_value = wb_data.iloc[6, col_idx] if not pd.isna(wb_data.iloc[6, col_idx]) else None
+                    # Resource header labels (rows 17-22) are the same for every date, so check them once per sheet;
+                    # nothing is printed unless a header is off
+                    header_issues = []
+                    for row_idx, expected_values in _RESOURCE_HEADERS:
+                        if sheet_rows > row_idx:
+                            actual_header = str(wb_data[row_idx][0]).strip()
+                            if not any(expected in actual_header for expected in expected_values):
+                                header_issues.append(f"Row {row_idx+1}: Expected {expected_values}, got '{actual_header}'")
+                    if header_issues:
+                        print(f"⚠️ HEADER ALIGNMENT ISSUES - Resource data may not be reliable: {'; '.join(header_issues)}")
+                    
+                    def first_resource_match(row_idx, data_type="numeric"):
+                        """Find the first valid resource value in a row, starting from column B
+                        
+                        Returns (column index, value), or (None, None) when the row has no valid data.
+                        """
+                        if sheet_rows <= row_idx:
+                            return None, None
+                        
+                        row_values = wb_data[row_idx]
+                        is_date_row = data_type == "date"
+                        for check_col in range(1, sheet_width):
+                            raw_value = row_values[check_col]
+                            # Date rows mostly hold datetimes already, which need no conversion
+                            val = raw_value if is_date_row and isinstance(raw_value, datetime) else _template_number(raw_value)
                             
-                            # DEBUG: Show raw date value
-                            if date_value:
-                                print(f"DEBUG - Raw date value from Excel: {date_value}, type: {type(date_value)}")
+                            # For date fields, check if it's a valid date
+                            if data_type == "date":
+                                # Handle datetime objects directly
+                                if isinstance(val, (datetime, pd.Timestamp)):
+                                    return check_col, val
+                                # Handle Excel date serials
+                                elif isinstance(val, (int, float)) and val > 40000:  # Excel date serial
+                                    return check_col, val
+                                # Try to parse string dates
+                                elif val and val != 0:
+                                    try:
+                                        parsed_date = pd.to_datetime(val, errors='coerce')
+                                        if parsed_date is not pd.NaT:
+                                            return check_col, parsed_date
+                                    except:
+                                        continue
                             
-                            if date_value:
+                            # For numeric fields, check if it's a valid number > 0
+                            elif data_type == "numeric" and val != 0 and not _is_blank(val):
                                 try:
-                                    # Force date format with multiple formats support
-                                    if isinstance(date_value, str):
-                                        # Try different date formats
-                                        for date_format in ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%m/%d/%Y"]:
-                                            try:
-                                                entry_date = pd.to_datetime(date_value, format=date_format)
-                                                break
-                                            except:
-                                                continue
-                                        else:
-                                            # If no format worked, let pandas infer
-                                            entry_date = pd.to_datetime(date_value, errors="coerce")
-                                    elif isinstance(date_value, (int, float)):
-                                        # Handle Excel date numbers
-                                        try:
-                                            # Excel stores dates as numbers since 1900-01-01
-                                            entry_date = pd.to_datetime('1899-12-30') + pd.Timedelta(days=int(date_value))
-                                        except:
-                                            entry_date = pd.to_datetime(date_value, errors="coerce")
-                                    else:
-                                        entry_date = pd.to_datetime(date_value)
-                                    
-                                    if pd.isna(entry_date):
-                                        print(f"DEBUG - Could not convert date value: {date_value}")
-                                        continue
-                                        
-                                    entry_date = entry_date.date()
-                                    print(f"DEBUG - Converted date: {entry_date} from {date_value}")
-                                    
-                                    # DEBUG: Print Excel data being read
-                                    print(f"DEBUG - Processing date: {entry_date}, Column: {col_idx}")
-                                    print(f"DEBUG - Excel sheet rows available: {len(wb_data)}")
-                                    
-                                    # Extract data from exact Excel rows as specified in mapping (adjusted for new row structure):
-                                    # Row 7: Date headers (already processed above)
-                                    # Row 8: Planned Total Cost (for interval flows)
-                                    # Row 9: Cumulative Budgeted Cost (for cumulative flows)
-                                    # Row 10: Planned % Daily (for interval completion percentage)
-                                    # Row 11: Cumulative % Daily (for cumulative completion percentage)
-                                    # Row 12: Elapsed % 
-                                    # Row 13: Elapsed Period
-                                    # Row 14: Actual Cost
-                                    
-                                    # Helper function to safely extract and convert values
-                                    def safe_extract_value(row_idx, col_idx, default=0):
-                                        if len(wb_data) > row_idx:
-                                            try:
-                                                raw_value = wb_data.iloc[row_idx, col_idx]
-                                                
-                                                # Special debugging for resource rows 17-22
-                                                if row_idx >= 16 and row_idx <= 21:  # rows 17-22 (0-indexed)
-                                                    print(f"🔍 RESOURCE DEBUG - Row {row_idx+1} (R{row_idx+1}), Col {col_idx}: '{raw_value}' (type: {type(raw_value)})")
-                                                    
-                                                    # Check first few columns to see if data exists elsewhere
-                                                    if col_idx > 5:  # Only check if we're not in early columns
-                                                        for check_col in range(0, min(10, wb_data.shape[1])):
-                                                            check_val = wb_data.iloc[row_idx, check_col] if wb_data.shape[1] > check_col else None
-                                                            if not pd.isna(check_val) and check_val != '' and check_val is not None:
-                                                                print(f"🔍 FOUND DATA - Row {row_idx+1}, Col {check_col}: '{check_val}' (type: {type(check_val)})")
-                                                                break
-                                                    
-                                                print(f"DEBUG - Raw value at row {row_idx+1}, col {col_idx}: '{raw_value}' (type: {type(raw_value)})")
-                                                
-                                                if pd.isna(raw_value) or raw_value == '' or raw_value is None:
-                                                    if row_idx >= 16 and row_idx <= 21:
-                                                        print(f"🔍 RESOURCE DEBUG - Row {row_idx+1} is NaN/empty, returning default: {default}")
-                                                    print(f"DEBUG - Value is NaN/empty, returning default: {default}")
-                                                    return default
-                                                
-                                                # Handle percentage strings
-                                                if isinstance(raw_value, str):
-                                                    # Clean the string first
-                                                    clean_value = str(raw_value).strip()
-                                                    
-                                                    # Remove thousands separators and handle Arabic/English numbers
-                                                    clean_value = clean_value.replace(',', '').replace('٬', '')
-                                                    
-                                                    if '%' in clean_value:
-                                                        try:
-                                                            result = float(clean_value.replace('%', '').strip())
-                                                            print(f"DEBUG - Converted percentage '{raw_value}' to {result}")
-                                                            return result
-                                                        except:
-                                                            print(f"DEBUG - Failed to convert percentage '{raw_value}', returning {default}")
-                                                            return default
-                                                    
-                                                    # Handle numeric strings
-                                                    try:
-                                                        result = float(clean_value)
-                                                        print(f"DEBUG - Converted string '{raw_value}' to {result}")
-                                                        return result
-                                                    except:
-                                                        print(f"DEBUG - Failed to convert string '{raw_value}', returning {default}")
-                                                        return default
-                                                
-                                                # Handle datetime values (for date rows 17 and 20)
-                                                if isinstance(raw_value, (datetime, pd.Timestamp)):
-                                                    print(f"DEBUG - Found datetime value: {raw_value}")
-                                                    return raw_value  # Return datetime as-is
-                                                
-                                                # Handle numeric values
-                                                try:
-                                                    result = float(raw_value)
-                                                    print(f"DEBUG - Numeric value: {result}")
-                                                    return result
-                                                except:
-                                                    print(f"DEBUG - Failed to convert '{raw_value}' to float, returning {default}")
-                                                    return default
-                                            except Exception as e:
-                                                print(f"DEBUG - Error extracting value at row {row_idx+1}, col {col_idx}: {e}")
-                                                return default
-                                        else:
-                                            if row_idx >= 16 and row_idx <= 21:
-                                                print(f"🔍 RESOURCE DEBUG - Row {row_idx+1} NOT AVAILABLE! Only {len(wb_data)} rows in Excel data")
-                                            print(f"DEBUG - Row {row_idx+1} not available in data (only {len(wb_data)} rows)")
-                                            return default
-                                    
-                                    planned_total_cost = safe_extract_value(7, col_idx)  # Row 8
-                                    cumulative_budgeted_cost = safe_extract_value(8, col_idx)  # Row 9
-                                    planned_daily_percent = safe_extract_value(9, col_idx)  # Row 10
-                                    cumulative_daily_percent = safe_extract_value(10, col_idx)  # Row 11
-                                    elapsed_percent = safe_extract_value(11, col_idx)  # Row 12
-                                    elapsed_period = safe_extract_value(12, col_idx)  # Row 13
-                                    actual_cost = safe_extract_value(13, col_idx)  # Row 14
-                                    
-                                    # Smart resource data extraction with header validation and multiple column search
-                                    def validate_header_alignment():
-                                        """Check if headers in rows 17-22 match expected values"""
-                                        expected_headers = {
-                                            16: ["Date", "تاريخ"],  # Row 17
-                                            17: ["Budgeted Labor Units Weekly", "العمالة الأسبوعية"],  # Row 18
-                                            18: ["Budgeted Nonlabor Units Weekly", "المعدات الأسبوعية"],  # Row 19
-                                            19: ["Date", "تاريخ"],  # Row 20
-                                            20: ["Budgeted Labor Units Monthly", "العمالة الشهرية"],  # Row 21
-                                            21: ["Budgeted Nonlabor Units Monthly", "المعدات الشهرية"]   # Row 22
-                                        }
-                                        
-                                        header_issues = []
-                                        for row_idx, expected_values in expected_headers.items():
-                                            if len(wb_data) > row_idx:
-                                                actual_header = str(wb_data.iloc[row_idx, 0]).strip()
-                                                if not any(expected in actual_header for expected in expected_values):
-                                                    header_issues.append(f"Row {row_idx+1}: Expected {expected_values}, got '{actual_header}'")
-                                        
-                                        if header_issues:
-                                            print(f"⚠️ HEADER ALIGNMENT ISSUES: {'; '.join(header_issues)}")
-                                        return len(header_issues) == 0
-                                    
-                                    def find_resource_data_smart(row_idx, data_type="numeric"):
-                                        """Smart search for resource data starting from column B with validation"""
-                                        # Start from column B (index 1) and search through available columns
-                                        start_col = 1  # Column B
-                                        max_search_cols = min(wb_data.shape[1], col_idx + 20)  # Extended search range
-                                        
-                                        for check_col in range(start_col, max_search_cols):
-                                            if len(wb_data) > row_idx and wb_data.shape[1] > check_col:
-                                                val = safe_extract_value(row_idx, check_col)
-                                                
-                                                # For date fields, check if it's a valid date
-                                                if data_type == "date":
-                                                    # Handle datetime objects directly
-                                                    if isinstance(val, (datetime, pd.Timestamp)):
-                                                        print(f"🔍 FOUND DATE DATA - Row {row_idx+1}, Col {check_col}: {val} (datetime object)")
-                                                        return val
-                                                    # Handle Excel date serials
-                                                    elif isinstance(val, (int, float)) and val > 40000:  # Excel date serial
-                                                        print(f"🔍 FOUND DATE DATA - Row {row_idx+1}, Col {check_col}: {val} (Excel serial)")
-                                                        return val
-                                                    # Try to parse string dates
-                                                    elif val and val != 0:
-                                                        try:
-                                                            parsed_date = pd.to_datetime(val, errors='coerce')
-                                                            if parsed_date is not pd.NaT:
-                                                                print(f"🔍 FOUND DATE DATA - Row {row_idx+1}, Col {check_col}: {val} (parsed)")
-                                                                return parsed_date
-                                                        except:
-                                                            continue
-                                                
-                                                # For numeric fields, check if it's a valid number > 0
-                                                elif data_type == "numeric" and val != 0 and not pd.isna(val):
-                                                    try:
-                                                        numeric_val = float(val)
-                                                        if numeric_val > 0:  # Only positive values
-                                                            print(f"🔍 FOUND RESOURCE DATA - Row {row_idx+1}, Col {check_col}: {numeric_val}")
-                                                            return numeric_val
-                                                    except:
-                                                        continue
-                                        
-                                        # No valid data found - return None instead of 0 to indicate missing data
-                                        print(f"❌ NO DATA FOUND - Row {row_idx+1} ({data_type}) in columns {start_col}-{max_search_cols-1}")
-                                        return None
-                                    
-                                    # Validate header alignment first
-                                    headers_valid = validate_header_alignment()
-                                    if not headers_valid:
-                                        print("⚠️ HEADER VALIDATION FAILED - Resource data may not be reliable")
-                                    
-                                    # Extract resource data with smart search (NO DEFAULT VALUES)
-                                    weekly_date = find_resource_data_smart(16, "date")         # Row 17
-                                    weekly_manpower = find_resource_data_smart(17, "numeric")  # Row 18
-                                    weekly_equipment = find_resource_data_smart(18, "numeric") # Row 19
-                                    monthly_date = find_resource_data_smart(19, "date")        # Row 20
-                                    monthly_manpower = find_resource_data_smart(20, "numeric") # Row 21
-                                    monthly_equipment = find_resource_data_smart(21, "numeric")# Row 22
-                                    
-                                    # Convert None to 0 only for storage, but keep track of missing data
-                                    # Special handling for dates - convert datetime to string for storage
-                                    if isinstance(weekly_date, (datetime, pd.Timestamp)):
-                                        weekly_date = weekly_date.strftime('%Y-%m-%d')
-                                    elif weekly_date is None:
-                                        weekly_date = 0
-                                    
-                                    if isinstance(monthly_date, (datetime, pd.Timestamp)):
-                                        monthly_date = monthly_date.strftime('%Y-%m-%d')
-                                    elif monthly_date is None:
-                                        monthly_date = 0
-                                    
-                                    weekly_manpower = weekly_manpower if weekly_manpower is not None else 0
-                                    weekly_equipment = weekly_equipment if weekly_equipment is not None else 0
-                                    monthly_manpower = monthly_manpower if monthly_manpower is not None else 0
-                                    monthly_equipment = monthly_equipment if monthly_equipment is not None else 0
-                                    
-                                    # DEBUG: Print extracted resource values
-                                    print(f"DEBUG - Resource extraction for date {entry_date}:")
-                                    print(f"  R17 (weekly_date): {weekly_date}")
-                                    print(f"  R18 (weekly_manpower): {weekly_manpower}")  
-                                    print(f"  R19 (weekly_equipment): {weekly_equipment}")
-                                    print(f"  R20 (monthly_date): {monthly_date}")
-                                    print(f"  R21 (monthly_manpower): {monthly_manpower}")
-                                    print(f"  R22 (monthly_equipment): {monthly_equipment}")
-                                    
-                                    
-                                    # DEBUG: Print extracted values with better formatting
-                                    print(f"DEBUG - Extracted values for {entry_date}:")
-                                    print(f"  Row 8 (Planned Total): {planned_total_cost} (type: {type(planned_total_cost)})")
-                                    print(f"  Row 9 (Cumulative Budgeted): {cumulative_budgeted_cost} (type: {type(cumulative_budgeted_cost)})")
-                                    print(f"  Row 9 (Daily %): {planned_daily_percent}")
-                                    print(f"  Row 10 (Cum %): {cumulative_daily_percent}")
-                                    print(f"  Row 13 (Actual): {actual_cost}")
-                                    
-                                    # Check if any values are non-zero
-                                    has_data = any([
-                                        planned_total_cost and planned_total_cost != 0,
-                                        cumulative_budgeted_cost and cumulative_budgeted_cost != 0,
-                                        actual_cost and actual_cost != 0
-                                    ])
-                                    print(f"DEBUG - Has non-zero data: {has_data}")
-                                    
-                                    # Clean percentage values
-                                    if isinstance(planned_daily_percent, str) and '%' in str(planned_daily_percent):
-                                        planned_daily_percent = float(str(planned_daily_percent).replace('%', ''))
-                                    if isinstance(cumulative_daily_percent, str) and '%' in str(cumulative_daily_percent):
-                                        cumulative_daily_percent = float(str(cumulative_daily_percent).replace('%', ''))
-                                    if isinstance(elapsed_percent, str) and '%' in str(elapsed_percent):
-                                        elapsed_percent = float(str(elapsed_percent).replace('%', ''))
-                                    
-                                    # Create progress data based on exact Excel mapping specification
-                                    # Store data according to cumulative vs interval mapping rules
-                                    # IMPORTANT: Database field mapping:
-                                    # - planned_cost: Row 8 (Cumulative Budgeted Cost) for cumulative calculations
-                                    # - actual_cost: Row 7 (Planned Total Cost) for interval calculations  
-                                    # - Row 13 (Actual Cost) stored in notes for future use
-                                    
-                                    progress_data = {
-                                        'project_name': current_project_name,
-                                        'entry_date': entry_date,
-                                        'planned_completion': float(cumulative_daily_percent),  # Row 10: Cumulative % Daily
-                                        'planned_cost': float(cumulative_budgeted_cost),  # Row 8: Cumulative Budgeted Cost (for cumulative flows)
-                                        'actual_completion': float(elapsed_percent),  # Row 11: Elapsed %
-                                        'actual_cost': float(planned_total_cost),  # Row 7: Planned Total Cost (for interval flows)
-                                        'notes': f'R7:{planned_total_cost}|R8:{cumulative_budgeted_cost}|R9:{planned_daily_percent}|R10:{cumulative_daily_percent}|R11:{elapsed_percent}|R12:{elapsed_period}|R13:{actual_cost}|R17:{weekly_date}|R18:{weekly_manpower}|R19:{weekly_equipment}|R20:{monthly_date}|R21:{monthly_manpower}|R22:{monthly_equipment}'
-                                    }
-                                    
+                                    numeric_val = float(val)
+                                    if numeric_val > 0:  # Only positive values
+                                        return check_col, numeric_val
+                                except:
+                                    continue
+                        
+                        return None, None
+                    
+                    # Rows 17-22 are searched once per sheet; each date column then only checks
+                    # whether the match lies within its search window
+                    resource_matches = {
+                        16: first_resource_match(16, "date"),      # Row 17
+                        17: first_resource_match(17, "numeric"),   # Row 18
+                        18: first_resource_match(18, "numeric"),   # Row 19
+                        19: first_resource_match(19, "date"),      # Row 20
+                        20: first_resource_match(20, "numeric"),   # Row 21
+                        21: first_resource_match(21, "numeric")    # Row 22
+                    }
+                    # Dates are stored in the notes as YYYY-MM-DD text; format them once here
+                    for row_idx in (16, 19):
+                        found_col, found_value = resource_matches[row_idx]
+                        if isinstance(found_value, (datetime, pd.Timestamp)):
+                            resource_matches[row_idx] = (found_col, found_value.strftime('%Y-%m-%d'))
+                    
+                    # A match is visible to date columns within 20 columns before it, i.e. from
+                    # column found_col - 19 on; rows without a match are stored as 0 (NO DEFAULT VALUES)
+                    resource_windows = [
+                        (found_col - 19, found_value) if found_col is not None else (sheet_width, 0)
+                        for found_col, found_value in (resource_matches[row_idx] for row_idx in range(16, 22))
+                    ]
+                    # From the column where every match is visible on, the six values are fixed for the sheet
+                    frozen_from = max(visible_from for visible_from, _ in resource_windows)
+                    frozen_resources = [value for _, value in resource_windows]
+                    
+                    # Only skip if ALL of rows 8, 9, 10, 11 and 14 are exactly 0: such columns are never
+                    # saved, so they are dropped here before any date parsing
+                    data_columns = [
+                        col_idx for col_idx in range(1, min(2001, sheet_width))  # Columns B to BXL (2000 columns)
+                        if any(value_rows[value_idx][col_idx] != 0 for value_idx in (0, 1, 2, 3, 6))
+                    ]
+                    
+                    dates_row = wb_data[6]
+                    for col_idx in data_columns:
+                        # Get date from row 7 (Dates row) - force date format
+                        date_value = dates_row[col_idx]
+                        if _is_blank(date_value):
+                            date_value = None
+                        
+                        if date_value:
+                            try:
+                                entry_date = self._parse_template_date(date_value)
+                                if pd.isna(entry_date):
+                                    continue
                                     
-                                    # Only skip if ALL values are exactly 0 or None
-                                    # Allow saving even if some values are 0 (for testing and debugging)
-                                    all_zero = (
-                                        (planned_total_cost == 0 or planned_total_cost is None) and
-                                        (cumulative_budgeted_cost == 0 or cumulative_budgeted_cost is None) and
-                                        (actual_cost == 0 or actual_cost is None) and
-                                        (planned_daily_percent == 0 or planned_daily_percent is None) and
-                                        (cumulative_daily_percent == 0 or cumulative_daily_percent is None)
+                                entry_date = entry_date.date()
+                                
+                                # Extract data from exact Excel rows as specified in mapping (adjusted for new row structure):
+                                # Row 7: Date headers (already processed above)
+                                # Row 8: Planned Total Cost (for interval flows)
+                                # Row 9: Cumulative Budgeted Cost (for cumulative flows)
+                                # Row 10: Planned % Daily (for interval completion percentage)
+                                # Row 11: Cumulative % Daily (for cumulative completion percentage)
+                                # Row 12: Elapsed % 
+                                # Row 13: Elapsed Period
+                                # Row 14: Actual Cost
+                                
+                                # Helper function to safely extract and convert values
+                                # Rows 8-14, already converted for the whole sheet
+                                (planned_total_cost, cumulative_budgeted_cost, planned_daily_percent,
+                                 cumulative_daily_percent, elapsed_percent, elapsed_period,
+                                 actual_cost) = [row_values[col_idx] for row_values in value_rows]
+                                
+                                # Resource rows 17-22 (weekly date, manpower, equipment; monthly date, manpower, equipment)
+                                if col_idx >= frozen_from:
+                                    resources = frozen_resources
+                                else:
+                                    resources = [value if col_idx >= visible_from else 0 for visible_from, value in resource_windows]
+                                (weekly_date, weekly_manpower, weekly_equipment,
+                                 monthly_date, monthly_manpower, monthly_equipment) = resources
+                                
+                                # Create progress data based on exact Excel mapping specification
+                                # Store data according to cumulative vs interval mapping rules
+                                # IMPORTANT: Database field mapping:
+                                # - planned_cost: Row 8 (Cumulative Budgeted Cost) for cumulative calculations
+                                # - actual_cost: Row 7 (Planned Total Cost) for interval calculations  
+                                # - Row 13 (Actual Cost) stored in notes for future use
+                                
+                                progress_data = {
+                                    'project_name': current_project_name,
+                                    'entry_date': entry_date,
+                                    'planned_completion': float(cumulative_daily_percent),  # Row 10: Cumulative % Daily
+                                    'planned_cost': float(cumulative_budgeted_cost),  # Row 8: Cumulative Budgeted Cost (for cumulative flows)
+                                    'actual_completion': float(elapsed_percent),  # Row 11: Elapsed %
+                                    'actual_cost': float(planned_total_cost),  # Row 7: Planned Total Cost (for interval flows)
+                                    'notes': _PROGRESS_NOTES_TEMPLATE.format(
+                                        planned_total_cost, cumulative_budgeted_cost, planned_daily_percent,
+                                        cumulative_daily_percent, elapsed_percent, elapsed_period, actual_cost,
+                                        weekly_date, weekly_manpower, weekly_equipment,
+                                        monthly_date, monthly_manpower, monthly_equipment
                                     )
-                                    
-                                    if all_zero:
-                                        print(f"DEBUG - Skipping {entry_date} - all values are 0 or None, not saving empty data")
-                                        continue  # Skip this entry entirely instead of saving with fake values
-                                    else:
-                                        print(f"DEBUG - Saving data for {entry_date} - has non-zero values")
-                                    
-                                    # DEBUG: Print final progress data being saved
-                                    print(f"DEBUG - Saving progress data: {progress_data}")
-                                    
-                                    result = self.data_manager.add_progress_data(progress_data)
-                                    print(f"DEBUG - Save result: {result}")
-                                    
-                                except Exception as e:
-                                    continue  # Skip invalid date entries
-                
+                                }
+                                
+                                
+                                progress_entries.append(progress_data)
+                                
+                            except Exception as e:
+                                continue  # Skip invalid date entries
+                    
+                    saved_entries = len(progress_entries) if self.data_manager.add_progress_data_bulk(progress_entries) else 0
+                    
+                    # One summary line per sheet instead of printing every cell and entry
+                    print(f"DEBUG - Imported {saved_entries} progress entries for project {current_project_name}")
+            
             # Final validation and return
             if success_count == 0 and not error_details:
                 error_details.append('لم يتم العثور على مشاريع صحيحة للاستيراد في الملف')
@@ -1361,11 +1460,9 @@ class ExcelExporter:
     def export_project_detailed_report(self, project_name: str) -> Optional[bytes]:
         """Export detailed project report to Excel"""
         try:
-            wb = Workbook()
-            
-            # Project info sheet
-            ws_info = wb.active
-            ws_info.title = "معلومات المشروع"
+            # Write-only workbook streams rows out instead of keeping every cell in memory
+            wb = Workbook(write_only=True)
+            self._add_named_styles(wb)
             
             project_info = self.data_manager.get_project_info(project_name)
             if not project_info:
@@ -1376,6 +1473,9 @@ class ExcelExporter:
             header_font = Font(bold=True, size=12)
             title_font = Font(bold=True, size=14)
             
+            # Project info sheet
+            ws_info = wb.create_sheet("معلومات المشروع")
+            
             # Add project information
             info_data = [
                 ['اسم المشروع', project_info['project_name']],
@@ -1388,36 +1488,43 @@ class ExcelExporter:
                 ['نوع المشروع', project_info['project_type']]
             ]
             
-            for idx, (label, value) in enumerate(info_data, 1):
-                ws_info.cell(row=idx, column=1, value=label).font = header_font
-                ws_info.cell(row=idx, column=1).alignment = arabic_alignment
-                ws_info.cell(row=idx, column=2, value=value).alignment = arabic_alignment
-                
+            # Column widths have to be known before the first row is streamed
+            self._set_column_widths(ws_info, info_data)
+            for label, value in info_data:
                 if 'الميزانية' in label and isinstance(value, (int, float)):
-                    ws_info.cell(row=idx, column=2).number_format = '#,##0.00'
+                    value_cell = self._styled_cell(ws_info, value, style='currency_ar')
+                else:
+                    value_cell = self._styled_cell(ws_info, value, alignment=arabic_alignment)
+                ws_info.append([
+                    self._styled_cell(ws_info, label, font=header_font, alignment=arabic_alignment),
+                    value_cell
+                ])
             
             # Progress data sheet
             progress_data = self.data_manager.get_progress_data(project_name)
             if not progress_data.empty:
                 ws_progress = wb.create_sheet("بيانات التقدم")
                 
-                # Add headers
                 progress_headers = ['تاريخ الإدخال', 'نسبة الإنجاز المخطط (%)', 'التكلفة المخططة',
                                   'نسبة الإنجاز الفعلي (%)', 'التكلفة الفعلية', 'ملاحظات']
-                
-                for col, header in enumerate(progress_headers, 1):
-                    cell = ws_progress.cell(row=1, column=col, value=header)
-                    cell.font = header_font
-                    cell.alignment = arabic_alignment
-                
-                # Add progress data
-                for row_idx, (_, row) in enumerate(progress_data.iterrows(), 2):
-                    ws_progress.cell(row=row_idx, column=1, value=row['entry_date']).alignment = arabic_alignment
-                    ws_progress.cell(row=row_idx, column=2, value=row['planned_completion']).alignment = arabic_alignment
-                    ws_progress.cell(row=row_idx, column=3, value=row['planned_cost']).number_format = '#,##0.00'
-                    ws_progress.cell(row=row_idx, column=4, value=row['actual_completion']).alignment = arabic_alignment
-                    ws_progress.cell(row=row_idx, column=5, value=row['actual_cost']).number_format = '#,##0.00'
-                    ws_progress.cell(row=row_idx, column=6, value=row['notes']).alignment = arabic_alignment
+                progress_columns = ['entry_date', 'planned_completion', 'planned_cost',
+                                    'actual_completion', 'actual_cost', 'notes']
+                progress_table = progress_data[progress_columns]
+                # Entry dates are shown date-only, so they are measured that way too
+                self._set_column_widths(ws_progress, [progress_headers],
+                                        table=progress_table.assign(entry_date=progress_table['entry_date'].dt.strftime('%Y-%m-%d')))
+                
+                # Add headers and progress data (date-only entry dates, currency format on the two cost columns)
+                aligned_style = {'alignment': arabic_alignment}
+                date_style = {'alignment': arabic_alignment, 'number_format': 'yyyy-mm-dd'}
+                currency_style = {'style': 'currency'}
+                self._write_tabular(
+                    ws_progress, progress_headers,
+                    progress_table.itertuples(index=False, name=None),
+                    header_style={'font': header_font, 'alignment': arabic_alignment},
+                    column_styles=[date_style, aligned_style, currency_style,
+                                   aligned_style, currency_style, aligned_style]
+                )
             
             # KPI sheet
             project_kpi = self.evm_calculator.calculate_project_kpi(project_name)
@@ -1435,34 +1542,23 @@ class ExcelExporter:
                     ['حالة المشروع', project_kpi['status']]
                 ]
                 
-                for idx, (label, value) in enumerate(kpi_data, 1):
-                    ws_kpi.cell(row=idx, column=1, value=label).font = header_font
-                    ws_kpi.cell(row=idx, column=1).alignment = arabic_alignment
-                    
+                # Indices are written as 3-decimal text, amounts in currency format
+                kpi_rows = []
+                for label, value in kpi_data:
+                    style = None
                     if isinstance(value, (int, float)):
                         if 'مؤشر' in label:
-                            ws_kpi.cell(row=idx, column=2, value=f"{value:.3f}")
+                            value = f"{value:.3f}"
                         else:
-                            ws_kpi.cell(row=idx, column=2, value=value)
-                            ws_kpi.cell(row=idx, column=2).number_format = '#,##0.00'
-                    else:
-                        ws_kpi.cell(row=idx, column=2, value=value)
-                    
-                    ws_kpi.cell(row=idx, column=2).alignment = arabic_alignment
-            
-            # Auto-adjust column widths
-            for ws in wb.worksheets:
-                for column in ws.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    ws.column_dimensions[column_letter].width = adjusted_width
+                            style = 'currency'
+                    kpi_rows.append((label, value, style))
+                
+                self._set_column_widths(ws_kpi, [[label, value] for label, value, _ in kpi_rows])
+                for label, value, style in kpi_rows:
+                    ws_kpi.append([
+                        self._styled_cell(ws_kpi, label, font=header_font, alignment=arabic_alignment),
+                        self._styled_cell(ws_kpi, value, alignment=arabic_alignment, style=style)
+                    ])
             
             # Save to bytes
             excel_buffer = io.BytesIO()
@@ -1477,11 +1573,9 @@ class ExcelExporter:
     def generate_2000_column_template(self, start_date: date, flow_type: str = "Daily") -> Optional[bytes]:
         """Generate Excel template with optimized columns for extensive time tracking"""
         try:
-            from openpyxl.utils import get_column_letter
-            
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Project Financial Data"
+            # Write-only workbook: every row is assembled first and streamed out with one append
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Project Financial Data")
             
             # Header styling
             header_font = Font(bold=True, size=12, color="FFFFFF")
@@ -1492,17 +1586,17 @@ class ExcelExporter:
             # Smart calculation: use actual project date range if available, otherwise default
             all_projects = self.data_manager.get_all_projects()
             if all_projects:
-                # Calculate optimal column count based on project dates
-                project_dates = []
-                for proj in all_projects:
-                    if proj.get('start_date'):
-                        project_dates.append(proj['start_date'])
-                    if proj.get('end_date'):
-                        project_dates.append(proj['end_date'])
-                
-                if project_dates:
-                    min_date = min(project_dates)
-                    max_date = max(project_dates)
+                # Calculate optimal column count based on project dates: every start and end
+                # date is parsed in one pass, skipping blanks and unparsable values
+                project_frame = pd.DataFrame(all_projects, columns=['start_date', 'end_date'])
+                project_dates = pd.to_datetime(
+                    pd.concat([project_frame['start_date'], project_frame['end_date']]).replace('', None),
+                    errors='coerce', format='mixed'
+                ).dropna()
+                
+                if not project_dates.empty:
+                    min_date = project_dates.min()
+                    max_date = project_dates.max()
                     # Calculate smart column count based on actual project duration
                     if flow_type == "Daily":
                         days_needed = (max_date - min_date).days + 90  # Add 90 days buffer
@@ -1527,30 +1621,29 @@ class ExcelExporter:
             
             all_headers = basic_headers + date_columns
             
-            # Add headers to first row - optimized bulk operation
             headers_to_use = all_headers[:self.max_columns]
-            for col, header in enumerate(headers_to_use, 1):
-                ws.cell(row=1, column=col, value=header)
-            
-            # Apply formatting to header range in bulk
-            header_range = f"A1:{get_column_letter(len(headers_to_use))}1"
-            for cell in ws[header_range][0]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-            
-            # Add cumulative row headers
-            ws.cell(row=2, column=1, value="CUMULATIVE")
-            ws.cell(row=2, column=1).font = Font(bold=True, color="FF0000")
-            
-            ws.cell(row=3, column=1, value="INTERVAL")
-            ws.cell(row=3, column=1).font = Font(bold=True, color="0000FF")
             
             # Get projects and populate data - limit to first 20 for performance
             all_projects = self.data_manager.get_all_projects()
             projects_to_process = all_projects[:20]  # Limit to 20 projects for better performance
-            current_row = 4
+            date_columns_to_use = date_columns[:self.max_columns - len(basic_headers)]
+            
+            # Dates of all the date columns, parsed once for every project
+            target_dates = self._parse_date_columns(date_columns_to_use, flow_type)
+            
+            # Fetch every project's progress in one query rather than once per project
+            progress_map = self.data_manager.get_progress_data_bulk(
+                [project['project_name'] for project in projects_to_process]
+            )
             
+            # Shared by every project without progress entries (it is only ever read)
+            zero_values = [0.0] * len(target_dates)
+            
+            # The CUMULATIVE and INTERVAL rows hold the totals across all projects
+            cumulative_totals = np.zeros(len(target_dates))
+            interval_totals = np.zeros(len(target_dates))
+            
+            project_rows = []
             for project in projects_to_process:
                 # Basic project information using Primavera-style format
                 project_data = [
@@ -1566,39 +1659,42 @@ class ExcelExporter:
                     project.get('project_description', '')
                 ]
                 
-                # Add basic project data
-                for col, value in enumerate(project_data, 1):
-                    ws.cell(row=current_row, column=col, value=value)
-                
                 # Get progress data for this project
-                progress_data = self.data_manager.get_progress_data(project['project_name'])
-                
-                # Populate financial data for each date column
-                for col_idx, date_col in enumerate(date_columns, len(basic_headers) + 1):
-                    if col_idx <= self.max_columns:
-                        # Calculate cumulative and interval values
-                        cumulative_value = self._get_cumulative_value(progress_data, date_col, flow_type)
-                        interval_value = self._get_interval_value(progress_data, date_col, flow_type)
-                        
-                        # Add to cumulative row
-                        ws.cell(row=2, column=col_idx, value=cumulative_value)
-                        
-                        # Add to interval row  
-                        ws.cell(row=3, column=col_idx, value=interval_value)
-                        
-                        # Add project specific data
-                        project_value = self._get_project_value_for_date(progress_data, date_col, flow_type)
-                        ws.cell(row=current_row, column=col_idx, value=project_value)
+                progress_data = progress_map.get(project['project_name'], pd.DataFrame())
                 
-                current_row += 1
-            
-            # Format columns
-            for col in range(1, min(self.max_columns + 1, len(all_headers) + 1)):
-                column_letter = ws.cell(row=1, column=col).column_letter
-                if col > len(basic_headers):  # Financial data columns
-                    ws.column_dimensions[column_letter].width = 12
-                else:  # Basic info columns
-                    ws.column_dimensions[column_letter].width = 15
+                # Cumulative and interval values for every date column at once; the project's
+                # own row holds its interval values
+                if progress_data.empty:
+                    interval_values = zero_values
+                else:
+                    cumulative_values, interval_values = self._get_flow_values(progress_data, target_dates, flow_type)
+                    cumulative_totals += cumulative_values
+                    interval_totals += interval_values
+                
+                project_rows.append(project_data + interval_values)
+            
+            # Format columns (widths have to be set before the first row is streamed); each
+            # block of equal widths is one column range rather than one entry per column
+            last_col = min(self.max_columns, len(all_headers))
+            for first, last, width in ((1, len(basic_headers), 15), (len(basic_headers) + 1, last_col, 12)):
+                if first <= last:
+                    dimension = ws.column_dimensions[_COL_LETTERS[first - 1]]
+                    dimension.min, dimension.max, dimension.width = first, last, width
+            
+            # Header row: every header cell shares one resolved style
+            header_cell = self._styled_cell(ws, None, font=header_font, fill=header_fill, alignment=header_alignment)
+            ws.append([self._cell_like(ws, header, header_cell) for header in headers_to_use])
+            
+            # Cumulative and interval total rows, each written once (date values start after
+            # the basic columns)
+            total_columns = [None] * (len(basic_headers) - 1) if project_rows and len(target_dates) else None
+            ws.append([self._styled_cell(ws, "CUMULATIVE", font=Font(bold=True, color="FF0000"))]
+                      + (total_columns + cumulative_totals.tolist() if total_columns is not None else []))
+            ws.append([self._styled_cell(ws, "INTERVAL", font=Font(bold=True, color="0000FF"))]
+                      + (total_columns + interval_totals.tolist() if total_columns is not None else []))
+            
+            for row in project_rows:
+                ws.append(row)
             
             # Save to BytesIO
             output = io.BytesIO()
@@ -1628,48 +1724,55 @@ class ExcelExporter:
         
         return []
     
-    def _get_cumulative_value(self, progress_data: pd.DataFrame, date_col: str, flow_type: str) -> float:
-        """Get cumulative financial value up to a specific date"""
-        if progress_data.empty:
-            return 0.0
+    def _get_flow_values(self, progress_data: pd.DataFrame, target_dates: pd.DatetimeIndex, flow_type: str) -> tuple:
+        """Get cumulative and interval financial values of a project for all date columns at once
         
-        try:
-            target_date = self._parse_date_column(date_col, flow_type)
-            progress_data_copy = progress_data.copy()
-            progress_data_copy['entry_date'] = pd.to_datetime(progress_data_copy['entry_date'])
-            
-            filtered_data = progress_data_copy[progress_data_copy['entry_date'] <= target_date]
-            return filtered_data['actual_cost'].sum() if not filtered_data.empty else 0.0
-        except:
-            return 0.0
-    
-    def _get_interval_value(self, progress_data: pd.DataFrame, date_col: str, flow_type: str) -> float:
-        """Get interval financial value for a specific period"""
-        if progress_data.empty:
-            return 0.0
+        target_dates holds each column's date (see _parse_date_columns). Cumulative values sum
+        actual_cost up to each column's date; interval values sum it within the column's day,
+        month or year. The entries are sorted once and each column's range is
+        found with searchsorted, so every sum covers the same entries in the same order as a
+        per-column filter would.
+        """
+        zeros = [0.0] * len(target_dates)
+        if progress_data.empty or not len(target_dates):
+            return zeros, list(zeros)
         
         try:
-            target_date = self._parse_date_column(date_col, flow_type)
-            progress_data_copy = progress_data.copy()
-            progress_data_copy['entry_date'] = pd.to_datetime(progress_data_copy['entry_date'])
-            
-            if flow_type == "Daily":
-                filtered_data = progress_data_copy[progress_data_copy['entry_date'].dt.date == target_date.date()]
-            elif flow_type == "Monthly":
-                filtered_data = progress_data_copy[
-                    (progress_data_copy['entry_date'].dt.year == target_date.year) &
-                    (progress_data_copy['entry_date'].dt.month == target_date.month)
-                ]
-            elif flow_type == "Yearly":
-                filtered_data = progress_data_copy[progress_data_copy['entry_date'].dt.year == target_date.year]
-            
-            return filtered_data['actual_cost'].sum() if not filtered_data.empty else 0.0
+            entry_dates = progress_data['entry_date']
+            # get_progress_data already returns parsed dates; only raw values need converting
+            if not pd.api.types.is_datetime64_any_dtype(entry_dates):
+                entry_dates = pd.to_datetime(entry_dates)
+            
+            # Entries without a date never match a column; missing costs count as 0
+            has_date = entry_dates.notna().to_numpy()
+            dated_entries = entry_dates.to_numpy()[has_date]
+            order = np.argsort(dated_entries, kind='stable')
+            sorted_dates = pd.DatetimeIndex(dated_entries[order])
+            costs = progress_data['actual_cost'].to_numpy(dtype=np.float64)[has_date][order]
+            costs = np.where(np.isnan(costs), 0.0, costs)
+            
+            cumulative_ends = sorted_dates.searchsorted(target_dates, side='right')
+            cumulative_values = [float(costs[:end].sum()) for end in cumulative_ends.tolist()]
+            
+            period_length = {"Daily": pd.DateOffset(days=1), "Monthly": pd.DateOffset(months=1),
+                             "Yearly": pd.DateOffset(years=1)}.get(flow_type)
+            if period_length is None:
+                return cumulative_values, zeros
+            period_starts = target_dates.normalize()
+            starts = sorted_dates.searchsorted(period_starts, side='left')
+            ends = sorted_dates.searchsorted(period_starts + period_length, side='left')
+            interval_values = [float(costs[start:end].sum()) for start, end in zip(starts.tolist(), ends.tolist())]
+            
+            return cumulative_values, interval_values
         except:
-            return 0.0
+            return zeros, list(zeros)
     
-    def _get_project_value_for_date(self, progress_data: pd.DataFrame, date_col: str, flow_type: str) -> float:
-        """Get project-specific value for a date (using interval by default)"""
-        return self._get_interval_value(progress_data, date_col, flow_type)
+    def _parse_date_columns(self, date_columns: List[str], flow_type: str) -> pd.DatetimeIndex:
+        """Parse all date column strings at once (same dates as _parse_date_column per column)"""
+        date_formats = {"Daily": '%Y-%m-%d', "Monthly": '%Y-%m', "Yearly": '%Y'}
+        if flow_type in date_formats:
+            return pd.DatetimeIndex(pd.to_datetime(date_columns, format=date_formats[flow_type]))
+        return pd.DatetimeIndex(pd.to_datetime(date_columns))
     
     def _parse_date_column(self, date_col: str, flow_type: str) -> pd.Timestamp:
         """Parse date column string to datetime object"""
@@ -1688,21 +1791,7 @@ class ExcelExporter:
             # Read Excel file
             df = pd.read_excel(excel_file, sheet_name=0)
             
-            # DEBUG: Print dataframe info after reading
-            print(f"DEBUG - Excel file imported successfully")
-            print(f"DEBUG - DataFrame shape: {df.shape}")
-            print(f"DEBUG - Column names: {list(df.columns)}")
-            print(f"DEBUG - First 10 rows of imported data:")
-            print(df.head(10))
-            print(f"DEBUG - Data types:")
-            print(df.dtypes)
-            
-            # Print specific rows that contain our data
-            print(f"DEBUG - Row 1 (Project Names): {df.iloc[0].tolist() if len(df) > 0 else 'N/A'}")
-            print(f"DEBUG - Row 6 (Dates): {df.iloc[5].tolist()[:10] if len(df) > 5 else 'N/A'}")
-            print(f"DEBUG - Row 7 (Planned Total): {df.iloc[6].tolist()[:10] if len(df) > 6 else 'N/A'}")
-            print(f"DEBUG - Row 8 (Cumulative): {df.iloc[7].tolist()[:10] if len(df) > 7 else 'N/A'}")
-            print(f"DEBUG - Row 13 (Actual Cost): {df.iloc[12].tolist()[:10] if len(df) > 12 else 'N/A'}")
+            print(f"DEBUG - Read 2000-column sheet with shape {df.shape}")
             
             # Extract basic project information with exact Excel column mapping as specified
             basic_columns = [
@@ -1727,69 +1816,92 @@ class ExcelExporter:
             categories = self.data_manager.get_parent_categories()
             category_map = {cat['category_name']: cat['id'] for cat in categories}
             
-            # Create reverse mapping for finding columns in the Excel file
-            def find_column_value(row, target_column):
-                """Find value from row using column mapping"""
-                if target_column in column_mapping:
-                    for possible_name in column_mapping[target_column]:
-                        if possible_name in row and pd.notna(row[possible_name]):
-                            return row[possible_name]
-                return None
-            
-            for _, row in df.iterrows():
-                project_name = find_column_value(row, 'Project Name')
+            # Resolve each field's aliases to one column up front; a later alias
+            # only fills the rows where the earlier ones are blank
+            resolved = {}
+            for target_column, aliases in column_mapping.items():
+                present = [c for c in aliases if c in df.columns]
+                if present:
+                    column = df[present[0]]
+                    for alias in present[1:]:
+                        column = column.combine_first(df[alias])
+                    resolved[target_column] = column
+            fields = pd.DataFrame(resolved, index=df.index).astype(object)
+            fields = fields.where(fields.notna(), None)
+            
+            # Financial data comes from the date columns (everything but the basic project info columns)
+            all_mapped_columns = []
+            for basic_col in basic_columns:
+                all_mapped_columns.extend(column_mapping.get(basic_col, [basic_col]))
+            
+            date_columns = [col for col in df.columns if col not in all_mapped_columns]
+            
+            # Rows are collected here and written in two bulk inserts after the loop
+            new_projects = []
+            project_rows = []
+            
+            for row_pos, record in enumerate(fields.to_dict('records')):
+                project_name = record.get('Project Name')
                 if project_name:
                     # Prepare project data using mapped columns
                     project_data = {
                         'project_name': project_name,
-                        'project_id': find_column_value(row, 'Project ID') or '',
-                        'parent_category_id': category_map.get(find_column_value(row, 'Parent Category'), None),
-                        'executing_company': find_column_value(row, 'Executing Company') or '',
+                        'project_id': record.get('Project ID') or '',
+                        'parent_category_id': category_map.get(record.get('Parent Category'), None),
+                        'executing_company': record.get('Executing Company') or '',
                         'consulting_company': '',  # Not in template
-                        'start_date': find_column_value(row, 'Start Date') or '',
-                        'end_date': find_column_value(row, 'Finish Date') or '',
-                        'total_budget': find_column_value(row, 'BL Project Total Cost') or 0,
-                        'project_location': find_column_value(row, 'Location') or '',
-                        'project_type': find_column_value(row, 'Type') or '',
-                        'project_description': find_column_value(row, 'Description') or '',
+                        'start_date': record.get('Start Date') or '',
+                        'end_date': record.get('Finish Date') or '',
+                        'total_budget': record.get('BL Project Total Cost') or 0,
+                        'project_location': record.get('Location') or '',
+                        'project_type': record.get('Type') or '',
+                        'project_description': record.get('Description') or '',
                         'display_order': 0,
                         'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     }
                     
-                    # Add or update project
-                    self.data_manager.add_project(project_data)
-                    
-                    # Import financial data from date columns (exclude basic project info columns)
-                    all_mapped_columns = []
-                    for basic_col in basic_columns:
-                        all_mapped_columns.extend(column_mapping.get(basic_col, [basic_col]))
-                    
-                    date_columns = [col for col in df.columns if col not in all_mapped_columns]
+                    # Excel date cells arrive as Timestamps, which sqlite3 cannot bind
+                    for date_key in ('start_date', 'end_date'):
+                        if isinstance(project_data[date_key], (datetime, date)):
+                            project_data[date_key] = project_data[date_key].strftime('%Y-%m-%d')
                     
-                    for date_col in date_columns:
-                        financial_value = row.get(date_col, 0)
-                        
-                        if pd.notna(financial_value) and financial_value > 0:
-                            # Parse date and add progress data
-                            try:
-                                entry_date = self._parse_date_column(date_col, "Daily")
-                                
-                                # For simple Excel import, use the financial value as interval data
-                                progress_data = {
-                                    'project_name': project_data['project_name'],
-                                    'entry_date': entry_date.strftime('%Y-%m-%d'),
-                                    'planned_completion': 0,
-                                    'planned_cost': 0,  # Set to 0 for cumulative flows (can be updated later)
-                                    'actual_completion': 0,
-                                    'actual_cost': float(financial_value),  # Use for interval flows
-                                    'notes': ''
-                                }
-                                
-                                self.data_manager.add_progress_data(progress_data)
-                            except Exception as e:
-                                print(f"Error importing date {date_col}: {e}")
-            
-            return True
+                    # Add or update project
+                    new_projects.append(project_data)
+                    project_rows.append(row_pos)
+            
+            # Only the positive cells of the projects' rows become progress entries
+            date_block = df[date_columns].iloc[project_rows]
+            mask = (date_block.notna() & (date_block > 0)).to_numpy()
+            row_positions, col_positions = np.nonzero(mask)
+            date_values = date_block.to_numpy()
+            
+            # Each date header is parsed once, however many projects have a value under it
+            entry_dates = {}
+            for col_pos in np.unique(col_positions):
+                date_col = date_columns[col_pos]
+                try:
+                    entry_dates[col_pos] = self._parse_date_column(date_col, "Daily").strftime('%Y-%m-%d')
+                except Exception as e:
+                    print(f"Error importing date {date_col}: {e}")
+            
+            progress_entries = []
+            for row_pos, col_pos in zip(row_positions, col_positions):
+                if col_pos in entry_dates:
+                    # For simple Excel import, use the financial value as interval data
+                    progress_entries.append({
+                        'project_name': new_projects[row_pos]['project_name'],
+                        'entry_date': entry_dates[col_pos],
+                        'planned_completion': 0,
+                        'planned_cost': 0,  # Set to 0 for cumulative flows (can be updated later)
+                        'actual_completion': 0,
+                        'actual_cost': float(date_values[row_pos, col_pos]),  # Use for interval flows
+                        'notes': ''
+                    })
+            
+            # Progress is only written for projects that were actually stored
+            if not self.data_manager.add_projects_bulk(new_projects):
+                return False
+            return self.data_manager.add_progress_data_bulk(progress_entries)
             
         except Exception as e:
             print(f"Error importing from Excel: {e}")
@@ -62,8 +62,7 @@ class ReportTemplateGenerator:
             current_row = 3
             
             # Executive Summary Section
-            ws[f'A{current_row}'].value = "الملخص التنفيذي"
-            ws[f'A{current_row}'].font = subheader_font
+            ws.cell(row=current_row, column=1, value="الملخص التنفيذي").font = subheader_font
             current_row += 2
             
             # Calculate summary metrics
@@ -103,16 +102,14 @@ class ReportTemplateGenerator:
             ]
             
             for metric, value in summary_data:
-                ws[f'A{current_row}'].value = metric
-                ws[f'C{current_row}'].value = value
-                ws[f'A{current_row}'].font = Font(bold=True)
+                ws.cell(row=current_row, column=1, value=metric).font = Font(bold=True)
+                ws.cell(row=current_row, column=3, value=value)
                 current_row += 1
             
             current_row += 2
             
             # Project Details Table
-            ws[f'A{current_row}'].value = "تفاصيل المشاريع"
-            ws[f'A{current_row}'].font = subheader_font
+            ws.cell(row=current_row, column=1, value="تفاصيل المشاريع").font = subheader_font
             current_row += 1
             
             # Table headers